@@ -15,10 +15,7 @@
 # Your Python code starts here
 
 
-from .core import daily_closing_prices, market_trading_info, daily_stock_ratios, margin_trading, FIP_trading_data
-from .config import DEFAULT_HEADERS, BASE_URL
-from .exceptions import CrawlerException, RequestFailedException
-from .ticker import Ticker
+import importlib
 
 __version__ = "0.1.0"
 __author__ = "JJ"
@@ -26,7 +23,60 @@ __author__ = "JJ"
 import warnings
 warnings.filterwarnings('default', category=DeprecationWarning, module='^twsepy')
 
-__all__ = [
-    'daily_closing_prices', 'market_trading_info', 'daily_stock_ratios', 'margin_trading', 'FIP_trading_data',
-    'DEFAULT_HEADERS', 'BASE_URL', 'CrawlerException', 'RequestFailedException', 'Ticker'
-]
+# Public names and the submodule defining them. Submodules are imported on first
+# attribute access, so `import twsepy` does not load pandas, requests or
+# exchange_calendars until they are needed (see benchmarks/bench_import.py).
+_LAZY_ATTRIBUTES = {
+    'daily_closing_prices': 'core',
+    'market_trading_info': 'core',
+    'daily_stock_ratios': 'core',
+    'margin_trading': 'core',
+    'FIP_trading_data': 'core',
+    'monthly_stock_prices': 'core',
+    'monthly_stock_ratios': 'core',
+    'DEFAULT_HEADERS': 'config',
+    'BASE_URL': 'config',
+    'CrawlerException': 'exceptions',
+    'RequestFailedException': 'exceptions',
+    'Ticker': 'ticker',
+    'Tickers': 'ticker',
+    'market_panel': 'ticker',
+    'ResponseCache': 'cache',
+    'set_default_cache': 'cache',
+    'LocalStore': 'store',
+    'Backfill': 'backfill',
+    'NoDataIndex': 'no_data',
+    'set_default_no_data_index': 'no_data',
+    'ProxyPool': 'utils',
+    'RollingAnalytics': 'analytics',
+    'watch': 'watcher',
+    'PublishWatcher': 'watcher',
+    'to_arrow': 'arrow_io',
+    'to_record_batches': 'arrow_io',
+    'write_ipc': 'arrow_io',
+    'read_ipc': 'arrow_io',
+    'share': 'arrow_io',
+    'unshare': 'arrow_io',
+    'to_ipc_stream': 'arrow_io',
+    'read_ipc_stream': 'arrow_io',
+}
+
+# Submodules that `import twsepy` used to load as a side effect, e.g. twsepy.utils.
+_SUBMODULES = ('aio', 'analytics', 'arrow_io', 'backfill', 'cache', 'calendar_manager', 'config', 'core', 'dtypes', 'exceptions', 'metrics', 'no_data',
+               'store', 'ticker', 'utils', 'watcher')
+
+__all__ = list(_LAZY_ATTRIBUTES)
+
+
+def __getattr__(name):
+    if name in _LAZY_ATTRIBUTES:
+        value = getattr(importlib.import_module(f".{_LAZY_ATTRIBUTES[name]}", __name__), name)
+        globals()[name] = value
+        return value
+    if name in _SUBMODULES:
+        return importlib.import_module(f".{name}", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,407 @@
+# Copyright 2024 JayC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Your Python code starts here
+
+
+import time
+import random
+import asyncio
+import logging
+import pandas as pd
+
+try:
+    import aiohttp
+except ImportError:  # aiohttp is only needed for the async API
+    aiohttp = None
+
+from .config import DEFAULT_HEADERS, BASE_URL
+from .exceptions import RequestFailedException
+from .metrics import default_metrics, endpoint_name
+from .no_data import is_known_empty, record_empty
+from .core import (decode_json, parse_daily_closing_prices, parse_market_trading_info, parse_daily_stock_ratios,
+                   parse_margin_trading, parse_FIP_trading_data)
+from .calendar_manager import get_calendar_manager
+from .ticker import DATA_COLUMNS, DATASET_COLUMNS, extract_tickers, select_columns
+
+logger = logging.getLogger('twsepy')
+
+
+class AsyncRateLimiter:
+    """
+    asyncio counterpart of utils.RateLimiter, using the same token bucket.
+
+    Every caller takes its token (or reserves a future one) before awaiting, so
+    waiting coroutines never block the event loop or each other.
+    """
+
+    def __init__(self, rate_limit=1, period=1, enabled=True, capacity=1):
+        """
+        Initialize AsyncRateLimiter instance.
+
+        :param rate_limit: Maximum number of requests allowed in the specified period.
+        :param period: Time period in seconds.
+        :param capacity: Maximum number of requests allowed in a burst.
+        """
+        self.rate_limit = rate_limit
+        self.period = period
+        self.enabled = enabled
+        self.capacity = capacity
+        self.tokens = capacity
+        self.last_refill = None
+
+    async def limit(self):
+        """
+        Take one token from the bucket, and if none is available, wait until it is refilled.
+        """
+        if not self.enabled:
+            return
+
+        now = asyncio.get_running_loop().time()
+        rate = self.rate_limit / self.period
+        if self.last_refill is not None:
+            self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * rate)
+        self.last_refill = now
+        self.tokens -= 1
+        if self.tokens < 0:
+            await asyncio.sleep(-self.tokens / rate)
+
+
+class AsyncClient:
+    """
+    Pooled aiohttp client for the TWSE endpoints.
+
+    Use it as an async context manager, or call close() when done.
+    """
+
+    def __init__(self, base_url=BASE_URL, rate_limiter=None, max_concurrency=32, headers=None, timeout=30, proxy=None,
+                 cache=None, retries=3, backoff=0.5):
+        """
+        Initialize AsyncClient instance.
+
+        :param base_url: Root URL of the TWSE API. Point it at a local server for testing.
+        :param rate_limiter: Optional AsyncRateLimiter shared by the requests.
+        :param max_concurrency: Maximum number of requests in flight.
+        :param headers: The request headers. Defaults to DEFAULT_HEADERS.
+        :param timeout: Total timeout of one request in seconds.
+        :param proxy: Optional proxy URL.
+        :param cache: Optional ResponseCache for the raw responses.
+        :param retries: Number of retries after the first attempt, as utils.Session.
+        :param backoff: Base delay in seconds, doubled on every retry.
+        """
+        if aiohttp is None:
+            raise ImportError("The async API requires aiohttp. Install it with `pip install aiohttp`.")
+        self.base_url = base_url.rstrip('/')
+        self.rate_limiter = rate_limiter or AsyncRateLimiter(enabled=False)
+        self.max_concurrency = max_concurrency
+        self.headers = headers or DEFAULT_HEADERS
+        self.timeout = timeout
+        self.proxy = proxy
+        self.cache = cache
+        self.retries = retries
+        self.backoff = backoff
+        self.session = None
+        self.semaphore = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def request(self, path, params):
+        """
+        Send a rate-limited GET request and return the response body.
+
+        Like utils.limited_request, connection errors, timeouts, 429 and 5xx responses are
+        retried with jittered exponential backoff.
+
+        :param path: Endpoint path relative to base_url, e.g. 'afterTrading/MI_INDEX'.
+        :param params: The request parameters.
+        :return: A (status code, body) tuple; the status of the last attempt once the retries are used up.
+        :raises RequestFailedException: When the last attempt fails with a connection error or a timeout.
+        """
+        status, text, _ = await self._send(path, params)
+        return status, text
+
+    async def _send(self, path, params):
+        # request(), plus whether the body is final: False for a cache entry written before the date closed.
+        url = f"{self.base_url}/{path}"
+        endpoint = endpoint_name(url)
+        if self.cache is not None:
+            entry = self.cache.get_entry(url, params)
+            if entry is not None:
+                default_metrics.record('cache_hits_total', endpoint)
+                return (200,) + entry
+            default_metrics.record('cache_misses_total', endpoint)
+
+        if self.session is None:
+            connector = aiohttp.TCPConnector(limit=self.max_concurrency, ttl_dns_cache=300)
+            self.session = aiohttp.ClientSession(connector=connector, headers=self.headers,
+                                                 timeout=aiohttp.ClientTimeout(total=self.timeout))
+            self.semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        for attempt in range(self.retries + 1):
+            if attempt:
+                default_metrics.record('retries_total', endpoint)
+            async with self.semaphore:  # Not held during the backoff below
+                start = time.perf_counter()
+                await self.rate_limiter.limit()
+                default_metrics.record('rate_limit_wait_seconds', endpoint, time.perf_counter() - start)
+                start = time.perf_counter()
+                try:
+                    async with self.session.get(url, params=params, proxy=self.proxy) as response:
+                        body = await response.read()
+                        status, text = response.status, body.decode(response.get_encoding())
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    default_metrics.record('errors_total', endpoint)
+                    if attempt == self.retries:
+                        raise RequestFailedException(f"Failed to retrieve {url} with {params}: {e}") from e
+                else:
+                    elapsed = time.perf_counter() - start
+                    default_metrics.record('requests_total', endpoint)
+                    default_metrics.record('request_seconds', endpoint, elapsed)
+                    default_metrics.record('response_bytes', endpoint, len(body))
+                    if status != 200:
+                        default_metrics.record('errors_total', endpoint)
+                    if logger.isEnabledFor(logging.INFO):
+                        logger.info("GET %s params=%s status=%s bytes=%d elapsed=%.3fs", url, params, status, len(body), elapsed)
+                    if not (status == 429 or status >= 500) or attempt == self.retries:
+                        break
+            await asyncio.sleep(self.backoff * 2 ** attempt * random.uniform(0.5, 1.5))
+
+        if self.cache is not None and status == 200 and text.lstrip().startswith('{'):
+            self.cache.set(url, params, text)
+        return status, text, True
+
+    async def _fetch(self, path, params, parse, error):
+        # Shared by the endpoint methods: skip and record requests known to have no data, like the core functions.
+        url = f"{self.base_url}/{path}"
+        if is_known_empty(url, params):  # Recorded by a NoDataIndex, see no_data.py
+            return pd.DataFrame()
+        status, text, final = await self._send(path, params)
+        if status != 200:
+            raise RequestFailedException(f"{error} Status code: {status}")
+        with default_metrics.timer('parse_seconds', endpoint_name(url)):
+            data = decode_json(text)
+            df = parse(data)
+            # As in core: MI_INDEX only counts as empty without any table, other endpoints when nothing parsed.
+            empty = not data.get('tables') if endpoint_name(url) == 'MI_INDEX' else df.empty
+            if empty and final:
+                record_empty(url, params)
+            return df
+
+    async def daily_closing_prices(self, date, select_type='ALL', table_index=8):
+        """
+        Async version of core.daily_closing_prices.
+        """
+        return await self._fetch('afterTrading/MI_INDEX', {'date': date, 'type': select_type, 'response': 'json'},
+                                 lambda data: parse_daily_closing_prices(data, table_index),
+                                 f"Failed to retrieve data for {date} with type {select_type}.")
+
+    async def market_trading_info(self, date):
+        """
+        Async version of core.market_trading_info.
+        """
+        return await self._fetch('afterTrading/FMTQIK', {'date': date, 'response': 'json'},
+                                 lambda data: parse_market_trading_info(data, date),
+                                 f"Failed to retrieve data for {date}.")
+
+    async def daily_stock_ratios(self, date, select_type):
+        """
+        Async version of core.daily_stock_ratios.
+        """
+        return await self._fetch('afterTrading/BWIBBU_d', {'date': date, 'selectType': select_type, 'response': 'json'},
+                                 lambda data: parse_daily_stock_ratios(data, date, select_type),
+                                 f"Failed to retrieve data for {date} with type {select_type}.")
+
+    async def margin_trading(self, date):
+        """
+        Async version of core.margin_trading.
+        """
+        return await self._fetch('marginTrading/MI_MARGN', {'date': date, 'selectType': 'STOCK', 'response': 'json'},
+                                 lambda data: parse_margin_trading(data, date),
+                                 f"Failed to retrieve data for {date} with type 'margin_trading'.")
+
+    async def FIP_trading_data(self, date, select_type='ALL'):
+        """
+        Async version of core.FIP_trading_data.
+        """
+        return await self._fetch('fund/T86', {'date': date, 'selectType': select_type, 'response': 'json'},
+                                 lambda data: parse_FIP_trading_data(data, date, select_type),
+                                 f"Failed to retrieve data for {date} with type {select_type}.")
+
+    async def fetch_dataset(self, dataset, date_str, select_type='ALLBUT0999'):
+        """
+        Async version of ticker.fetch_dataset.
+        """
+        if dataset == 'prices':
+            return await self.daily_closing_prices(date_str, 'ALL', 8)
+        if dataset == 'margin':
+            return await self.margin_trading(date_str)
+        if dataset == 'ratios':
+            return await self.daily_stock_ratios(date_str, 'ALL')
+        if dataset == 'institutional':
+            return await self.FIP_trading_data(date_str, select_type)
+        raise ValueError(f"Unknown dataset: {dataset}")
+
+
+async def _with_client(client, method, *args):
+    if client is not None:
+        return await getattr(client, method)(*args)
+    async with AsyncClient() as client:
+        return await getattr(client, method)(*args)
+
+
+async def daily_closing_prices(date, select_type='ALL', table_index=8, client=None):
+    """
+    Async version of core.daily_closing_prices. A temporary AsyncClient is used unless `client` is given.
+    """
+    return await _with_client(client, 'daily_closing_prices', date, select_type, table_index)
+
+
+async def market_trading_info(date, client=None):
+    """
+    Async version of core.market_trading_info. A temporary AsyncClient is used unless `client` is given.
+    """
+    return await _with_client(client, 'market_trading_info', date)
+
+
+async def daily_stock_ratios(date, select_type, client=None):
+    """
+    Async version of core.daily_stock_ratios. A temporary AsyncClient is used unless `client` is given.
+    """
+    return await _with_client(client, 'daily_stock_ratios', date, select_type)
+
+
+async def margin_trading(date, client=None):
+    """
+    Async version of core.margin_trading. A temporary AsyncClient is used unless `client` is given.
+    """
+    return await _with_client(client, 'margin_trading', date)
+
+
+async def FIP_trading_data(date, select_type='ALL', client=None):
+    """
+    Async version of core.FIP_trading_data. A temporary AsyncClient is used unless `client` is given.
+    """
+    return await _with_client(client, 'FIP_trading_data', date, select_type)
+
+
+async def download_tickers(client, tickers, trading_days, select_type='ALLBUT0999', datasets=tuple(DATASET_COLUMNS),
+                           columns=None):
+    """
+    Async version of ticker.download_tickers.
+
+    Every (dataset, date) request is scheduled at once; the client bounds how many
+    are actually in flight.
+
+    :return type: DataFrame indexed by (Date, Ticker).
+    """
+    datasets, columns = select_columns(datasets, columns)
+    date_strs = [date.strftime('%Y%m%d') for date in trading_days]
+    if not date_strs:
+        return pd.DataFrame(columns=columns, index=pd.MultiIndex.from_arrays([[], []], names=['Date', 'Ticker']))
+
+    async def fetch(date_str, dataset):
+        df = await client.fetch_dataset(dataset, date_str, select_type)
+        column_map = {column: position for column, position in DATASET_COLUMNS[dataset].items() if column in columns}
+        return extract_tickers(df, tickers, column_map)
+
+    keys = [(date_str, dataset) for date_str in date_strs for dataset in datasets]
+    tasks = [asyncio.ensure_future(fetch(*key)) for key in keys]
+    try:
+        tables = dict(zip(keys, await asyncio.gather(*tasks)))
+    except BaseException:
+        # Stop the other fetches before the caller closes the client; the first error is raised as is.
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+    frames = []
+    for date_str in date_strs:
+        day = pd.concat([tables[date_str, dataset] for dataset in datasets], axis=1).reindex(tickers)
+        day.index = pd.MultiIndex.from_product([[pd.to_datetime(date_str)], tickers], names=['Date', 'Ticker'])
+        frames.append(day)
+    return pd.concat(frames).reindex(columns=columns)
+
+
+class AsyncTicker:
+    """
+    Async counterpart of ticker.Ticker.
+    """
+
+    def __init__(self, ticker, client=None):
+        self.ticker = ticker
+        self.client = client
+        self.data_columns = list(DATA_COLUMNS)
+        self.data = pd.DataFrame(columns=self.data_columns)
+
+    async def download(self, start_date, end_date, select_type='ALLBUT0999', datasets=tuple(DATASET_COLUMNS), columns=None):
+        trading_days = get_calendar_manager().get_trading_dates(start_date, end_date)
+        if len(trading_days) == 0:
+            return
+
+        if self.client is not None:
+            new_data = await download_tickers(self.client, [self.ticker], trading_days, select_type, datasets, columns)
+        else:
+            async with AsyncClient() as client:
+                new_data = await download_tickers(client, [self.ticker], trading_days, select_type, datasets, columns)
+        new_data = new_data.xs(self.ticker, level='Ticker').reset_index()
+        self.data = pd.concat([self.data, new_data], ignore_index=True) if not self.data.empty else new_data
+
+
+class AsyncTickers:
+    """
+    Async counterpart of ticker.Tickers.
+    """
+
+    def __init__(self, tickers, client=None):
+        self.tickers = list(dict.fromkeys(tickers))
+        self.client = client
+        self.data_columns = list(DATA_COLUMNS)
+        self.data = pd.DataFrame(columns=self.data_columns[1:], index=pd.MultiIndex.from_arrays([[], []], names=['Date', 'Ticker']))
+
+    async def download(self, start_date, end_date, select_type='ALLBUT0999', datasets=tuple(DATASET_COLUMNS), columns=None):
+        trading_days = get_calendar_manager().get_trading_dates(start_date, end_date)
+        if len(trading_days) == 0:
+            return
+
+        if self.client is not None:
+            new_data = await download_tickers(self.client, self.tickers, trading_days, select_type, datasets, columns)
+        else:
+            async with AsyncClient() as client:
+                new_data = await download_tickers(client, self.tickers, trading_days, select_type, datasets, columns)
+        self.data = pd.concat([self.data, new_data]) if not self.data.empty else new_data
+
+    def __getitem__(self, ticker):
+        if ticker not in self.tickers:
+            raise KeyError(ticker)
+        if self.data.empty:
+            return pd.DataFrame(columns=['Date'] + list(self.data.columns))
+        return self.data.xs(ticker, level='Ticker').reset_index()
+
+# Usage example:
+# async def main():
+#     async with AsyncClient(rate_limiter=AsyncRateLimiter(rate_limit=5, period=5), max_concurrency=16) as client:
+#         prices = await client.daily_closing_prices('20240701')
+#         ticker = AsyncTicker('2330', client=client)
+#         await ticker.download('20240601', '20240630')
+# asyncio.run(main())
@@ -0,0 +1,271 @@
+# Copyright 2024 JayC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Your Python code starts here
+
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+from .dtypes import convert_series
+
+SMA_WINDOWS = (5, 20, 60)
+SMA_COLUMNS = ('Close', 'Volume')
+CHANGE_COLUMNS = ('Margin Current Balance', 'Short Current Balance')
+CUMULATIVE_COLUMNS = ('FII Net Buy/Sell', 'IT Net Buy/Sell', 'PT Net Buy/Sell', 'Three Institutional Investors Net Buy/Sell')
+PERCENTILE_COLUMNS = ('PE Ratio', 'PB Ratio')
+PERCENTILE_WINDOW = 252  # About one year of trading days
+
+
+# Indicator kernels. Each works on a float64 array of shape (days, series), one column
+# per ticker, and computes the whole history at once.
+
+def rolling_mean(values, window):
+    """
+    Mean of the last ``window`` days; NaN until the window is full or while it holds a NaN,
+    like pandas rolling(window).mean().
+    """
+    missing = np.isnan(values)
+    sums = np.cumsum(np.where(missing, 0.0, values), axis=0)
+    counts = np.cumsum(missing, axis=0)
+    sums[window:] = sums[window:] - sums[:-window]
+    counts[window:] = counts[window:] - counts[:-window]
+    means = sums / window
+    means[counts > 0] = np.nan
+    means[:window - 1] = np.nan
+    return means
+
+
+def change(values):
+    """
+    Difference with the previous day, NaN on the first day, like pandas diff().
+    """
+    changes = np.full_like(values, np.nan)
+    changes[1:] = values[1:] - values[:-1]
+    return changes
+
+
+def cumulative_sum(values):
+    """
+    Running total since the first day; days without a value add nothing.
+    """
+    return np.nancumsum(values, axis=0)
+
+
+def rolling_percentile(values, window):
+    """
+    Share of the last ``window`` days (the current one included) whose value is at most
+    the current one, ignoring NaN, like pandas rolling(window, min_periods=1).rank(pct=True, method='max').
+    """
+    if len(values) == 0:
+        return values.copy()
+    padded = np.concatenate([np.full((window - 1,) + values.shape[1:], np.nan), values])
+    windows = sliding_window_view(padded, window, axis=0)  # (days, series, window)
+    current = values[..., None]
+    below = (windows <= current).sum(axis=-1)
+    valid = (~np.isnan(windows)).sum(axis=-1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(np.isnan(values), np.nan, below / valid)
+
+
+class RollingAnalytics:
+    """
+    Rolling indicators over Ticker.data or Tickers.data that are updated one day at a time.
+
+    The history is computed once with the vectorized kernels above. After that, append()
+    takes the rows of one new trading day and updates every indicator from a small state
+    kept per series: ring buffers and running sums for the moving averages, the previous
+    value for the changes, running totals for the cumulative sums and a ring buffer of
+    the percentile window. An update costs the same whatever the length of the history.
+
+    Indicators:
+        '<column> SMA <n>'          moving average over n days, for sma_columns and sma_windows
+        '<column> Change'           day-over-day change, e.g. of the margin balances
+        '<column> Cumulative'       running total, e.g. of institutional net buy/sell
+        '<column> Percentile'       rank of the day's value among the last percentile_window days, in (0, 1]
+    """
+
+    def __init__(self, data, sma_windows=SMA_WINDOWS, sma_columns=SMA_COLUMNS, change_columns=CHANGE_COLUMNS,
+                 cumulative_columns=CUMULATIVE_COLUMNS, percentile_columns=PERCENTILE_COLUMNS,
+                 percentile_window=PERCENTILE_WINDOW):
+        """
+        Initialize RollingAnalytics instance.
+
+        :param data: Ticker.data (one row per date with a 'Date' column) or Tickers.data
+            (indexed by (Date, Ticker)), typed or not. Columns it lacks are skipped.
+        :param sma_windows: Windows in days of the moving averages.
+        :param sma_columns: Columns to compute the moving averages of.
+        :param change_columns: Columns to compute the day-over-day change of.
+        :param cumulative_columns: Columns to compute the running total of.
+        :param percentile_columns: Columns to compute the rolling percentile of.
+        :param percentile_window: Window in days of the percentiles.
+        """
+        columns = set(data.columns)
+        self.sma_windows = tuple(sma_windows)
+        self.sma_columns = [column for column in sma_columns if column in columns]
+        self.change_columns = [column for column in change_columns if column in columns]
+        self.cumulative_columns = [column for column in cumulative_columns if column in columns]
+        self.percentile_columns = [column for column in percentile_columns if column in columns]
+        self.percentile_window = percentile_window
+        self.inputs = list(dict.fromkeys(self.sma_columns + self.change_columns + self.cumulative_columns
+                                         + self.percentile_columns))
+        self.multi = isinstance(data.index, pd.MultiIndex)
+
+        dates, self.tickers, arrays = self._to_arrays(data)
+        self.n_days = len(dates)
+        self._history = self._frame(dates, self._compute(arrays))
+        self._appended = []  # Frames returned by append(), concatenated when features is read
+        self._init_state(arrays)
+
+    @property
+    def features(self):
+        """
+        DataFrame of every indicator, in the index layout of the data: by Date for a
+        single ticker, by (Date, Ticker) for several.
+        """
+        if self._appended:
+            self._history = pd.concat([self._history] + self._appended)
+            self._appended = []
+        return self._history
+
+    def append(self, day):
+        """
+        Add one trading day and update every indicator.
+
+        :param day: The rows of the new day in the layout of the data: one row of
+            Ticker.data, or the (Date, Ticker) rows of Tickers.data for that date.
+            Tickers not present are treated as missing values.
+        :return type: DataFrame of the day's indicators.
+        """
+        dates, _, arrays = self._to_arrays(day, self.tickers)
+        if len(dates) != 1:
+            raise ValueError(f"append() takes the rows of one date, got {len(dates)}")
+        values = {column: arrays[column][0] for column in self.inputs}
+        position = self.n_days
+        self.n_days += 1
+
+        result = {}
+        for column in self.sma_columns:
+            value = values[column]
+            missing = np.isnan(value)
+            for window in self.sma_windows:
+                buffer, sums, counts = self._sma[column, window]
+                slot = position % window
+                old = buffer[slot]
+                sums -= np.where(np.isnan(old), 0.0, old)
+                counts += missing.astype(np.int64) - np.isnan(old)
+                buffer[slot] = value
+                sums += np.where(missing, 0.0, value)
+                result[f"{column} SMA {window}"] = np.where(counts > 0, np.nan, sums / window)
+        for column in self.change_columns:
+            result[f"{column} Change"] = values[column] - self._previous[column]
+            self._previous[column] = values[column]
+        for column in self.cumulative_columns:
+            self._totals[column] += np.where(np.isnan(values[column]), 0.0, values[column])
+            result[f"{column} Cumulative"] = self._totals[column].copy()
+        for column in self.percentile_columns:
+            buffer = self._percentile[column]
+            value = values[column]
+            buffer[position % self.percentile_window] = value
+            with np.errstate(invalid='ignore', divide='ignore'):
+                result[f"{column} Percentile"] = np.where(
+                    np.isnan(value), np.nan, (buffer <= value).sum(axis=0) / (~np.isnan(buffer)).sum(axis=0))
+
+        frame = self._frame(dates, {name: values[None, :] for name, values in result.items()})
+        self._appended.append(frame)
+        return frame
+
+    def _compute(self, arrays):
+        result = {}
+        for column in self.sma_columns:
+            for window in self.sma_windows:
+                result[f"{column} SMA {window}"] = rolling_mean(arrays[column], window)
+        for column in self.change_columns:
+            result[f"{column} Change"] = change(arrays[column])
+        for column in self.cumulative_columns:
+            result[f"{column} Cumulative"] = cumulative_sum(arrays[column])
+        for column in self.percentile_columns:
+            result[f"{column} Percentile"] = rolling_percentile(arrays[column], self.percentile_window)
+        return result
+
+    def _init_state(self, arrays):
+        # The state holds the last days of every series; missing history counts as NaN.
+        self._sma = {}
+        for column in self.sma_columns:
+            for window in self.sma_windows:
+                buffer = self._ring_buffer(arrays[column], window)
+                self._sma[column, window] = (buffer, np.nansum(buffer, axis=0), np.isnan(buffer).sum(axis=0))
+        self._previous = {column: self._last(arrays[column]) for column in self.change_columns}
+        self._totals = {column: np.nansum(arrays[column], axis=0) for column in self.cumulative_columns}
+        self._percentile = {column: self._ring_buffer(arrays[column], self.percentile_window)
+                            for column in self.percentile_columns}
+
+    def _ring_buffer(self, values, window):
+        # Day i sits in slot i % window, as append() expects.
+        buffer = np.full((window, len(self.tickers)), np.nan)
+        recent = values[-window:] if len(values) else values
+        for day, row in zip(range(self.n_days - len(recent), self.n_days), recent):
+            buffer[day % window] = row
+        return buffer
+
+    def _last(self, values):
+        return values[-1].copy() if len(values) else np.full(len(self.tickers), np.nan)
+
+    def _to_arrays(self, data, tickers=None):
+        if self.multi:
+            # Scatter the (Date, Ticker) rows into (days, tickers) arrays.
+            date_codes, dates = pd.factorize(data.index.get_level_values('Date'), sort=True)
+            ticker_level = data.index.get_level_values('Ticker').astype(str)
+            if tickers is None:
+                tickers = list(dict.fromkeys(ticker_level))
+            positions = pd.Index(tickers).get_indexer(ticker_level)
+            known = positions >= 0
+            arrays = {}
+            for column in self.inputs:
+                array = np.full((len(dates), len(tickers)), np.nan)
+                array[date_codes[known], positions[known]] = _numeric(data[column])[known]
+                arrays[column] = array
+            return pd.DatetimeIndex(dates), tickers, arrays
+
+        if 'Date' in data.columns:
+            data = data.sort_values('Date', kind='stable')
+            dates = pd.DatetimeIndex(pd.to_datetime(data['Date']))
+        else:
+            data = data.sort_index(kind='stable')
+            dates = pd.DatetimeIndex(data.index)
+        arrays = {column: _numeric(data[column])[:, None] for column in self.inputs}
+        return dates, tickers or [None], arrays
+
+    def _frame(self, dates, result):
+        if self.multi:
+            index = pd.MultiIndex.from_product([dates, self.tickers], names=['Date', 'Ticker'])
+        else:
+            index = pd.DatetimeIndex(dates, name='Date')
+        # One 2-D block is much cheaper to build than one column at a time, which matters in append().
+        values = np.column_stack([values.ravel() for values in result.values()]) if result else None
+        return pd.DataFrame(values, index=index, columns=list(result))
+
+
+def _numeric(series):
+    if pd.api.types.is_numeric_dtype(series.dtype):
+        return series.to_numpy(dtype='float64', na_value=np.nan)
+    return pd.to_numeric(convert_series(series), errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+
+# Usage example:
+# ticker = Ticker('2330')
+# ticker.download('20230101', '20231231')
+# analytics = ticker.analytics()
+# analytics.features.tail()
+# ticker.download('20240102', '20240102')
+# analytics.append(ticker.data.iloc[[-1]])   # O(1) per series
@@ -0,0 +1,191 @@
+# Copyright 2024 JayC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Your Python code starts here
+
+
+"""
+Apache Arrow export of twsepy DataFrames. Needs pyarrow.
+
+Typed columns become plain Arrow buffers, so an uncompressed Arrow IPC file can be
+memory-mapped by any number of processes on the host: they share one copy of the
+data in the page cache and read it without deserializing. share() writes such a file
+to shared memory (/dev/shm) for handing data to worker processes; the IPC stream
+functions produce and read bytes for moving data between hosts.
+"""
+
+import os
+import uuid
+import tempfile
+import threading
+import pandas as pd
+from .dtypes import convert_types
+from .store import unique_columns
+
+SHARED_MEMORY_DIR = '/dev/shm'
+
+
+def to_arrow(df, typed=True):
+    """
+    Convert a DataFrame from the core functions, Ticker, Tickers or market_panel to an Arrow table.
+
+    Index levels with names, e.g. (Date, Ticker), become the first columns, and repeated
+    column names such as MI_MARGN's are made unique.
+
+    :param df: The DataFrame.
+    :param typed: Convert string columns to numeric, datetime64 and categorical dtypes
+        first, so they are stored as Arrow numbers, timestamps and dictionaries.
+    :return type: pyarrow.Table.
+    """
+    pa = _pyarrow()
+    if typed:
+        df = convert_types(df)  # Before reset_index, which would turn a YYYYMMDD Date index into numbers
+    df = df.reset_index(drop=all(name is None for name in df.index.names))
+    df.columns = unique_columns([str(column) for column in df.columns])
+    return pa.Table.from_pandas(df, preserve_index=False)
+
+
+def to_record_batches(df, max_chunksize=65536, typed=True):
+    """
+    Convert a DataFrame to Arrow record batches of at most max_chunksize rows.
+
+    :return: List of pyarrow.RecordBatch.
+    """
+    return table_of(df, typed).to_batches(max_chunksize=max_chunksize)
+
+
+def write_ipc(data, path, typed=True):
+    """
+    Write a DataFrame or Arrow table to an uncompressed Arrow IPC file, which read_ipc
+    can memory-map without copying. The file is replaced atomically.
+
+    :param data: DataFrame, pyarrow.Table or list of pyarrow.RecordBatch.
+    :param path: Destination file.
+    :return: The path.
+    """
+    pa = _pyarrow()
+    table = table_of(data, typed)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with pa.OSFile(tmp_path, 'wb') as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp_path, path)
+    return path
+
+
+def read_ipc(path, memory_map=True):
+    """
+    Open an Arrow IPC file.
+
+    With memory_map the table's buffers point into the mapped file: nothing is read or
+    decoded up front, and processes mapping the same file share its pages. Call
+    to_pandas() on the table for a DataFrame; numeric columns without nulls can be
+    converted without copying with to_pandas(split_blocks=True).
+
+    :param path: File written by write_ipc or share.
+    :param memory_map: Map the file instead of reading it into memory.
+    :return type: pyarrow.Table.
+    """
+    pa = _pyarrow()
+    source = pa.memory_map(path, 'r') if memory_map else pa.OSFile(path, 'rb')
+    return pa.ipc.open_file(source).read_all()
+
+
+def share(data, name=None, directory=None, typed=True):
+    """
+    Write data to shared memory as an Arrow IPC file, for worker processes on the same
+    host to open with read_ipc. Remove the file with unshare() once the workers have it
+    open; their mappings stay valid.
+
+    :param data: DataFrame, pyarrow.Table or list of pyarrow.RecordBatch.
+    :param name: Optional file name. Defaults to a random one.
+    :param directory: Defaults to /dev/shm, or the temporary directory where it does not exist.
+    :return: Path of the file, to pass to the workers.
+    """
+    if directory is None:
+        directory = SHARED_MEMORY_DIR if os.path.isdir(SHARED_MEMORY_DIR) else tempfile.gettempdir()
+    path = os.path.join(directory, name or f"twsepy-{uuid.uuid4().hex}.arrow")
+    return write_ipc(data, path, typed)
+
+
+def unshare(path):
+    """
+    Remove a file written by share().
+    """
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def to_ipc_stream(data, sink=None, typed=True):
+    """
+    Serialize data in the Arrow IPC streaming format, e.g. to send it to another host.
+
+    :param data: DataFrame, pyarrow.Table or list of pyarrow.RecordBatch.
+    :param sink: Optional writable file-like object, e.g. a socket's makefile('wb').
+    :return: The stream as bytes, or None when written to sink.
+    """
+    pa = _pyarrow()
+    table = table_of(data, typed)
+    output = pa.BufferOutputStream() if sink is None else sink
+    with pa.ipc.new_stream(output, table.schema) as writer:
+        for batch in table.to_batches():
+            writer.write_batch(batch)
+    return output.getvalue().to_pybytes() if sink is None else None
+
+
+def read_ipc_stream(source):
+    """
+    Read data written by to_ipc_stream.
+
+    :param source: bytes, a pyarrow buffer or a readable file-like object.
+    :return type: pyarrow.Table.
+    """
+    pa = _pyarrow()
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        source = pa.py_buffer(source)
+    return pa.ipc.open_stream(source).read_all()
+
+
+def table_of(data, typed=True):
+    """
+    Return data as an Arrow table: DataFrames go through to_arrow, tables are kept and
+    record batches are combined.
+    """
+    pa = _pyarrow()
+    if isinstance(data, pd.DataFrame):
+        return to_arrow(data, typed)
+    if isinstance(data, pa.Table):
+        return data
+    return pa.Table.from_batches(list(data))
+
+
+def _pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.ipc  # noqa: F401  Not loaded by `import pyarrow` in every version
+    except ImportError as e:
+        raise ImportError("Arrow export needs pyarrow: pip install pyarrow") from e
+    return pa
+
+# Usage example:
+# path = share(Tickers(['2330', '2454']).data)          # parent, once
+# with ProcessPoolExecutor() as executor:
+#     executor.map(work, [path] * 8)                    # each worker: read_ipc(path)
+# unshare(path)
+#
+# payload = to_ipc_stream(market_panel('20240601', '20240630'))
+# table = read_ipc_stream(payload)                      # on another host
@@ -0,0 +1,211 @@
+# Copyright 2024 JayC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Your Python code starts here
+
+
+import os
+import json
+import threading
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from .cache import TAIPEI
+from .utils import FileRateLimiter, set_default_session, simple_progress_bar
+from .calendar_manager import get_calendar_manager
+from .ticker import DATASET_COLUMNS, fetch_dataset
+
+# Endpoint and type requested for each dataset; None stands for the backfill's select_type.
+DATASET_REQUESTS = {
+    'prices': ('MI_INDEX', 'ALL'),
+    'margin': ('MI_MARGN', 'STOCK'),
+    'ratios': ('BWIBBU_d', 'ALL'),
+    'institutional': ('T86', None),
+}
+
+
+class Journal:
+    """
+    Append-only JSON Lines record of finished backfill tasks.
+
+    Every task is written as one line once its partition is in the store, and the file
+    is flushed and synced right away, so after a crash or Ctrl-C the journal lists
+    exactly the tasks that do not need to run again.
+    """
+
+    def __init__(self, path):
+        self.path = os.path.expanduser(path)
+        self.lock = threading.Lock()
+
+    def completed(self):
+        """
+        Return the (dataset, date, select_type) keys of the tasks recorded as done.
+        """
+        done = set()
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:  # A line cut short by a crash
+                        continue
+                    if entry.get('status') == 'done':
+                        done.add((entry['dataset'], entry['date'], entry['select_type']))
+        except FileNotFoundError:
+            pass
+        return done
+
+    def record(self, task, status, **fields):
+        """
+        Append the outcome of a task.
+
+        :param task: (dataset, date, select_type) key.
+        :param status: 'done' or 'failed'.
+        :param fields: Extra fields, e.g. rows or error.
+        """
+        dataset, date, select_type = task
+        entry = {'dataset': dataset, 'endpoint': DATASET_REQUESTS[dataset][0], 'date': date,
+                 'select_type': select_type, 'status': status, **fields}
+        with self.lock:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+
+    def clear(self):
+        with self.lock:
+            if os.path.exists(self.path):
+                os.remove(self.path)
+
+
+class Backfill:
+    """
+    Resumable multi-process backfill of full-market tables into a LocalStore.
+
+    The job is planned as (dataset, date, select_type) tasks over the trading days of
+    CalendarManager. Worker processes fetch, parse and write one partition per task, so
+    parsing uses every core, while a FileRateLimiter keeps all of them within one request
+    budget. Finished tasks go to a Journal; running the same backfill again skips them
+    and carries on where the previous run stopped.
+    """
+
+    def __init__(self, store, journal=None, rate_limiter=None, session=None, select_type='ALLBUT0999'):
+        """
+        Initialize Backfill instance.
+
+        :param store: LocalStore receiving the tables.
+        :param journal: Journal file. Defaults to backfill.jsonl in the store root.
+        :param rate_limiter: FileRateLimiter shared by the worker processes. Defaults to 5
+            requests per 5 seconds, with its state next to the journal.
+        :param session: Optional Session for the requests, copied to every worker.
+        :param select_type: The type passed to FIP_trading_data.
+        """
+        self.store = store
+        self.journal = Journal(journal or os.path.join(store.root, 'backfill.jsonl'))
+        if rate_limiter is None:
+            rate_limiter = FileRateLimiter(os.path.join(store.root, 'backfill-rate.json'), rate_limit=5, period=5)
+        self.rate_limiter = rate_limiter
+        self.session = session
+        self.select_type = select_type
+
+    def plan(self, start_date, end_date, datasets=tuple(DATASET_COLUMNS)):
+        """
+        Return the tasks between start_date and end_date not yet recorded as done.
+
+        :return: List of (dataset, date, select_type) tuples, in date order.
+        """
+        for dataset in datasets:
+            if dataset not in DATASET_REQUESTS:
+                raise ValueError(f"Unknown dataset: {dataset}")
+
+        done = self.journal.completed()
+        trading_days = get_calendar_manager().get_trading_dates(start_date, end_date)
+        tasks = []
+        for date in trading_days:
+            date_str = date.strftime('%Y%m%d')
+            for dataset in datasets:
+                task = (dataset, date_str, DATASET_REQUESTS[dataset][1] or self.select_type)
+                if task not in done:
+                    tasks.append(task)
+        return tasks
+
+    def run(self, start_date, end_date, datasets=tuple(DATASET_COLUMNS), processes=None):
+        """
+        Run the tasks planned between start_date and end_date.
+
+        A failed task is recorded as failed and the others go on; it is planned again
+        on the next run. Days from the current session that return no data are neither
+        stored nor journaled, so they are fetched again once TWSE has published them.
+
+        :param start_date: Start date (format: YYYYMMDD).
+        :param end_date: End date (format: YYYYMMDD).
+        :param datasets: Datasets to backfill, any of 'prices', 'margin', 'ratios', 'institutional'.
+        :param processes: Number of worker processes. Defaults to the number of CPUs.
+        :return: Dictionary with the numbers of tasks 'done', 'empty' and 'pending', and the 'failed' tasks.
+        """
+        tasks = self.plan(start_date, end_date, datasets)
+        summary = {'done': 0, 'empty': 0, 'pending': 0, 'failed': []}
+        if not tasks:
+            return summary
+
+        today = datetime.now(TAIPEI).strftime('%Y%m%d')
+        with ProcessPoolExecutor(max_workers=processes or os.cpu_count(), initializer=_init_worker,
+                                 initargs=(self.store, self.rate_limiter, self.session)) as executor:
+            futures = {executor.submit(_run_task, task, today): task for task in tasks}
+            try:
+                for i, future in enumerate(as_completed(futures), 1):
+                    task = futures[future]
+                    try:
+                        rows = future.result()
+                    except Exception as e:
+                        self.journal.record(task, 'failed', error=f"{type(e).__name__}: {e}")
+                        summary['failed'].append(task)
+                    else:
+                        if rows is None:
+                            summary['pending'] += 1
+                        else:
+                            self.journal.record(task, 'done', rows=rows)
+                            summary['done'] += 1
+                            summary['empty'] += rows == 0
+                    simple_progress_bar(i, len(tasks), 'backfill')
+            except BaseException:
+                executor.shutdown(wait=True, cancel_futures=True)
+                raise
+        return summary
+
+
+# State of a worker process, set once by _init_worker.
+_worker = {}
+
+
+def _init_worker(store, rate_limiter, session):
+    _worker['store'] = store
+    _worker['rate_limiter'] = rate_limiter
+    _worker['session'] = session
+    set_default_session(None)  # Do not reuse connections inherited from the parent process
+
+
+def _run_task(task, today):
+    dataset, date_str, select_type = task
+    df = fetch_dataset(dataset, date_str, select_type, rate_limiter=_worker['rate_limiter'], session=_worker['session'])
+    if df.empty and date_str >= today:
+        return None
+    _worker['store'].write(dataset, date_str, df)
+    return len(df)
+
+# Usage example:
+# store = LocalStore('~/twse-data')
+# job = Backfill(store, rate_limiter=FileRateLimiter('~/twse-data/rate.json', rate_limit=5, period=5))
+# job.run('20100101', '20231231', processes=8)   # interrupt at any time...
+# job.run('20100101', '20231231', processes=8)   # ...and run again to resume
@@ -0,0 +1,27 @@
+# Copyright 2024 JayC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Your Python code starts here
+
+
+"""
+Run every benchmark:
+    python -m twsepy.benchmarks
+"""
+
+from twsepy.benchmarks import bench_import, bench_parse, bench_typed, bench_download, bench_async, bench_watch, bench_proxies, bench_analytics, bench_arrow
+
+for module in (bench_import, bench_parse, bench_typed, bench_download, bench_async, bench_watch, bench_proxies, bench_analytics, bench_arrow):
+    print(f"\n== {module.__name__.rsplit('.', 1)[-1]} ==")
+    module.main()
@@ -0,0 +1,104 @@
+# Copyright 2024 JayC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Your Python code starts here
+
+
+"""
+Time to update rolling indicators after appending one trading day: recomputing the
+whole history in pandas vs RollingAnalytics.append.
+
+Both produce the same indicators (moving averages, balance changes, cumulative net
+buy/sell, PE/PB percentiles) on synthetic typed data in the layout of Ticker.data and
+Tickers.data.
+
+Run from the directory containing twsepy:
+    python -m twsepy.benchmarks.bench_analytics
+"""
+
+import time
+import numpy as np
+import pandas as pd
+from twsepy.analytics import (RollingAnalytics, SMA_WINDOWS, SMA_COLUMNS, CHANGE_COLUMNS, CUMULATIVE_COLUMNS,
+                              PERCENTILE_COLUMNS, PERCENTILE_WINDOW)
+from twsepy.ticker import DATA_COLUMNS
+from twsepy.benchmarks.fixtures import codes
+
+APPENDED_DAYS = 20
+
+
+def history(n_days, tickers, seed=0):
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range('2010-01-04', periods=n_days)
+    values = rng.normal(100, 10, (n_days * len(tickers), len(DATA_COLUMNS) - 1))
+    data = pd.DataFrame(values, columns=DATA_COLUMNS[1:])
+    if len(tickers) == 1:
+        data.insert(0, 'Date', dates)
+        return data
+    data.index = pd.MultiIndex.from_product([dates, tickers], names=['Date', 'Ticker'])
+    return data
+
+
+def naive_features(data):
+    # What callers do today: recompute every indicator over the whole history.
+    if isinstance(data.index, pd.MultiIndex):
+        wide = {column: data[column].unstack('Ticker') for column in data.columns}
+    else:
+        frame = data.set_index('Date')
+        wide = {column: frame[column] for column in frame.columns}
+    out = {}
+    for column in SMA_COLUMNS:
+        for window in SMA_WINDOWS:
+            out[f"{column} SMA {window}"] = wide[column].rolling(window).mean()
+    for column in CHANGE_COLUMNS:
+        out[f"{column} Change"] = wide[column].diff()
+    for column in CUMULATIVE_COLUMNS:
+        out[f"{column} Cumulative"] = wide[column].fillna(0).cumsum()
+    for column in PERCENTILE_COLUMNS:
+        out[f"{column} Percentile"] = wide[column].rolling(PERCENTILE_WINDOW, min_periods=1).rank(pct=True, method='max')
+    return out
+
+
+def per_day(func, days):
+    start = time.perf_counter()
+    for day in days:
+        func(day)
+    return (time.perf_counter() - start) / len(days)
+
+
+def main():
+    print(f"Seconds per appended day, mean of {APPENDED_DAYS} days")
+    print(f"{'data':28}{'naive s':>10}{'append s':>10}{'speedup':>9}")
+    for n_days in (250, 2500):
+        for n_tickers in (1, 50):
+            tickers = codes(n_tickers)
+            data = history(n_days + APPENDED_DAYS, tickers)
+            if n_tickers == 1:
+                base, days = data.iloc[:n_days], [data.iloc[[n_days + i]] for i in range(APPENDED_DAYS)]
+                grown = [data.iloc[:n_days + i + 1] for i in range(APPENDED_DAYS)]
+            else:
+                dates = data.index.get_level_values('Date').unique()
+                base = data.loc[dates[:n_days]]
+                days = [data.loc[[dates[n_days + i]]] for i in range(APPENDED_DAYS)]
+                grown = [data.loc[dates[:n_days + i + 1]] for i in range(APPENDED_DAYS)]
+
+            naive = per_day(naive_features, grown)
+            analytics = RollingAnalytics(base)
+            incremental = per_day(analytics.append, days)
+            label = f"{n_days} days, {n_tickers} ticker{'s' if n_tickers > 1 else ''}"
+            print(f"{label:28}{naive:>10.4f}{incremental:>10.4f}{naive / incremental:>8.0f}x")
+
+
+if __name__ == '__main__':
+    main()
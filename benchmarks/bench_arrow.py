@@ -0,0 +1,99 @@
+# Copyright 2024 JayC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Your Python code starts here
+
+
+"""
+Handing a month of full-market MI_INDEX tables to worker processes: a pickled
+DataFrame per worker vs one Arrow IPC file in shared memory that every worker maps.
+
+Each worker gets the data and averages the closing price. Reported: bytes sent to or
+written for the workers, the parent's export time and the wall time of the whole
+handoff, unpickling included. Needs pyarrow.
+
+Run from the directory containing twsepy:
+    python -m twsepy.benchmarks.bench_arrow
+"""
+
+import os
+import time
+import pickle
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from twsepy.core import parse_daily_closing_prices
+from twsepy.dtypes import convert_types
+from twsepy.arrow_io import share, unshare, read_ipc, to_ipc_stream
+from twsepy.benchmarks.fixtures import mi_index
+
+WORKERS = 4
+CLOSE = '收盤價'
+
+
+def market_month(n_days=20):
+    dates = pd.bdate_range('2024-06-03', periods=n_days).strftime('%Y%m%d')
+    frames = [parse_daily_closing_prices(mi_index(date), 8) for date in dates]
+    return pd.concat(frames, ignore_index=True)
+
+
+def mean_close_pickled(df):
+    close = df[CLOSE]
+    if not pd.api.types.is_numeric_dtype(close):
+        close = pd.to_numeric(close.str.replace(',', ''), errors='coerce')
+    return close.mean()
+
+
+def mean_close_shared(path):
+    import pyarrow.compute as pc
+    return pc.mean(read_ipc(path).column(CLOSE)).as_py()
+
+
+def handoff(executor, func, args):
+    start = time.perf_counter()
+    list(executor.map(func, [args] * WORKERS))
+    return time.perf_counter() - start
+
+
+def main():
+    raw = market_month()
+    typed = convert_types(raw)
+    print(f"{len(raw)} rows x {len(raw.columns)} columns to {WORKERS} worker processes")
+    print(f"{'handoff':30}{'MB out':>9}{'export s':>10}{'wall s':>9}")
+    with ProcessPoolExecutor(max_workers=WORKERS) as executor:
+        list(executor.map(time.sleep, [0] * WORKERS))  # start the workers up front
+
+        for name, df in [('pickle, object strings', raw), ('pickle, typed', typed)]:
+            start = time.perf_counter()
+            size = len(pickle.dumps(df, protocol=pickle.HIGHEST_PROTOCOL))
+            export = time.perf_counter() - start
+            wall = handoff(executor, mean_close_pickled, df)
+            print(f"{name:30}{size * WORKERS / 2 ** 20:>9.1f}{export:>10.3f}{wall:>9.3f}")
+
+        start = time.perf_counter()
+        path = share(typed, typed=False)
+        export = time.perf_counter() - start
+        try:
+            wall = handoff(executor, mean_close_shared, path)
+            size = os.path.getsize(path)
+        finally:
+            unshare(path)
+        print(f"{'Arrow IPC in /dev/shm, mmap':30}{size / 2 ** 20:>9.1f}{export:>10.3f}{wall:>9.3f}")
+
+    start = time.perf_counter()
+    stream = to_ipc_stream(typed, typed=False)
+    print(f"\nArrow IPC stream for another host: {len(stream) / 2 ** 20:.1f} MB in {time.perf_counter() - start:.3f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+# Copyright 2024 JayC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Your Python code starts here
+
+
+"""
+The async API against the local stand-in server: AsyncTickers.download vs the threaded
+Tickers.download over the same month, and the errors AsyncClient raises.
+
+Checks that both downloads return the same data, with and without injected 503s that the
+retries must absorb, and that a server answering only 503s or not answering at all makes
+the async download raise RequestFailedException without leaving fetches running. Then
+reports the wall times, after one untimed download. Exits with status 1 when a check
+fails. Needs aiohttp; no network is used.
+
+Run from the directory containing twsepy:
+    python -m twsepy.benchmarks.bench_async
+"""
+
+import io
+import sys
+import time
+import asyncio
+from contextlib import redirect_stdout
+from twsepy.aio import AsyncClient, AsyncTickers
+from twsepy.ticker import Tickers
+from twsepy.utils import RateLimiter
+from twsepy.exceptions import RequestFailedException
+from twsepy.benchmarks.server import TWSEStandIn
+from twsepy.benchmarks.fixtures import codes
+
+START_DATE = '20240601'
+END_DATE = '20240630'
+CONCURRENCY = 16
+BACKOFF = 0.05
+ERROR_RATE = 0.05
+
+
+async def download_async(base_url, tickers):
+    async with AsyncClient(base_url=base_url, max_concurrency=CONCURRENCY, backoff=BACKOFF) as client:
+        target = AsyncTickers(tickers, client=client)
+        await target.download(START_DATE, END_DATE)
+    return target.data
+
+
+def download_threaded(stand_in, tickers):
+    session = stand_in.session(pool_size=CONCURRENCY, backoff=BACKOFF)
+    target = Tickers(tickers, rate_limiter=RateLimiter(enabled=False), session=session)
+    with redirect_stdout(io.StringIO()):  # silence the progress bar
+        target.download(START_DATE, END_DATE, max_workers=CONCURRENCY)
+    return target.data
+
+
+async def fails_cleanly(base_url, tickers):
+    # The download must raise RequestFailedException and leave no fetch running.
+    try:
+        await download_async(base_url, tickers)
+    except RequestFailedException:
+        return not [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+    except Exception:  # Anything else escaping is the failure this check is for
+        return False
+    return False
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    return func(*args), time.perf_counter() - start
+
+
+def main(latency=0.05):
+    tickers = codes(50)
+    checks = []
+    rows = []
+    with TWSEStandIn(latency=latency) as stand_in:
+        stand_in.warm(START_DATE, END_DATE)
+        download_threaded(stand_in, tickers)  # Untimed: the first download in a process pays one-off pandas/pyarrow costs
+
+        for error_rate in (0.0, ERROR_RATE):
+            stand_in.error_rate = error_rate
+            stand_in.reset_counters()
+            async_data, async_wall = timed(asyncio.run, download_async(stand_in.url, tickers))
+            rows.append((f"AsyncTickers.download, {error_rate:.0%} 503", async_wall, len(async_data), stand_in.requests))
+            stand_in.reset_counters()
+            threaded_data, threaded_wall = timed(download_threaded, stand_in, tickers)
+            rows.append((f"Tickers.download, {error_rate:.0%} 503", threaded_wall, len(threaded_data), stand_in.requests))
+            checks.append((f"{error_rate:.0%} 503 -> same data as Tickers",
+                           async_data.astype(str).equals(threaded_data.astype(str))))
+
+        stand_in.error_rate = 1.0
+        checks.append(('always 503 -> RequestFailedException', asyncio.run(fails_cleanly(stand_in.url, tickers[:2]))))
+        stand_in.error_rate = 0.0
+        url = stand_in.url
+    checks.append(('server down -> RequestFailedException', asyncio.run(fails_cleanly(url, tickers[:2]))))
+
+    print(f"Tickers download {START_DATE}-{END_DATE}, {len(tickers)} tickers, {CONCURRENCY} in flight, "
+          f"{latency * 1000:.0f}ms server latency")
+    print(f"{'client':34}{'wall s':>8}{'rows':>6}{'req':>6}")
+    for name, wall, n_rows, requests in rows:
+        print(f"{name:34}{wall:>8.2f}{n_rows:>6}{requests:>6}")
+    print()
+    for name, passed in checks:
+        print(f"{name:40}{'ok' if passed else 'FAILED'}")
+    return all(passed for _, passed in checks)
+
+
+if __name__ == '__main__':
+    sys.exit(0 if main() else 1)
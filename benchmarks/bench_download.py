@@ -0,0 +1,104 @@
+# Copyright 2024 JayC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Your Python code starts here
+
+
+"""
+End-to-end Ticker.download throughput against the local stand-in server.
+
+Measures wall time, requests and bytes for a range of worker counts,
+rate-limiter settings and injected error rates, then the peak Python memory of
+download and iter_download. No network is used.
+
+Run from the directory containing twsepy:
+    python -m twsepy.benchmarks.bench_download
+"""
+
+import io
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+from twsepy.ticker import Ticker, Tickers
+from twsepy.utils import RateLimiter
+from twsepy.benchmarks.server import TWSEStandIn
+from twsepy.benchmarks.fixtures import codes
+
+START_DATE = '20240601'
+END_DATE = '20240630'
+
+SCENARIOS = [
+    # name, tickers, max_workers, rate limiter (rate_limit, period, capacity) or None, error rate
+    ('sequential', ['2330'], 1, None, 0.0),
+    ('4 workers', ['2330'], 4, None, 0.0),
+    ('16 workers', ['2330'], 16, None, 0.0),
+    ('16 workers, 50 tickers', None, 16, None, 0.0),
+    ('16 workers, 20 req/s', ['2330'], 16, (20, 1, 1), 0.0),
+    ('16 workers, 20 req/s, burst 10', ['2330'], 16, (20, 1, 10), 0.0),
+    ('16 workers, 5% errors', ['2330'], 16, None, 0.05),
+]
+
+
+def make_target(stand_in, tickers, max_workers, limiter):
+    rate_limiter = RateLimiter(*limiter[:2], capacity=limiter[2]) if limiter else RateLimiter(enabled=False)
+    session = stand_in.session(pool_size=max(max_workers, 1), retries=3, backoff=0.05)
+    if len(tickers) == 1:
+        return Ticker(tickers[0], rate_limiter=rate_limiter, session=session)
+    return Tickers(tickers, rate_limiter=rate_limiter, session=session)
+
+
+def run(stand_in, tickers, max_workers, limiter, error_rate):
+    stand_in.error_rate = error_rate
+    stand_in.reset_counters()
+    target = make_target(stand_in, tickers, max_workers, limiter)
+    start = time.perf_counter()
+    with redirect_stdout(io.StringIO()):  # silence the progress bar
+        target.download(START_DATE, END_DATE, max_workers=max_workers)
+    return time.perf_counter() - start, len(target.data)
+
+
+def peak_memory(func):
+    tracemalloc.start()
+    try:
+        with redirect_stdout(io.StringIO()):
+            func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def main(latency=0.05):
+    all_tickers = codes(50)
+    with TWSEStandIn(latency=latency) as stand_in:
+        stand_in.warm(START_DATE, END_DATE)
+
+        print(f"Ticker.download {START_DATE}-{END_DATE}, {latency * 1000:.0f}ms server latency")
+        print(f"{'scenario':34}{'wall s':>8}{'rows':>6}{'req':>6}{'err':>5}{'MB sent':>9}{'req/s':>8}")
+        for name, tickers, max_workers, limiter, error_rate in SCENARIOS:
+            elapsed, rows = run(stand_in, tickers or all_tickers, max_workers, limiter, error_rate)
+            print(f"{name:34}{elapsed:>8.2f}{rows:>6}{stand_in.requests:>6}{stand_in.errors:>5}"
+                  f"{stand_in.bytes_sent / 2 ** 20:>9.1f}{stand_in.requests / elapsed:>8.1f}")
+
+        stand_in.error_rate = 0.0
+        print(f"\n{'peak Python memory':34}{'MB':>8}")
+        ticker = make_target(stand_in, ['2330'], 4, None)
+        for name, func in [
+            ('download, 4 workers', lambda: ticker.download(START_DATE, END_DATE, max_workers=4)),
+            ('iter_download by week, 4 workers', lambda: [None for _ in ticker.iter_download(START_DATE, END_DATE, chunk='week', max_workers=4)]),
+        ]:
+            print(f"{name:34}{peak_memory(func) / 2 ** 20:>8.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+# Copyright 2024 JayC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Your Python code starts here
+
+
+"""
+Import time of twsepy, measured with `python -X importtime` in fresh interpreters.
+
+Each statement runs after a baseline that imports its third-party dependencies
+(pandas, requests), and only the imports it adds on top are timed: the budgets cover
+twsepy's own modules, not how fast the machine imports pandas. The run fails (exit
+status 1) if a budget is exceeded or if a module that should stay unloaded, such as
+exchange_calendars, gets imported.
+
+Run from the directory containing twsepy:
+    python -m twsepy.benchmarks.bench_import
+"""
+
+import os
+import sys
+import subprocess
+
+PACKAGE = __package__.split('.')[0]
+
+# Third-party imports timed separately, as the baseline of the statements that need them.
+DEPENDENCIES = 'import pandas, requests'
+
+# (statement, baseline, budget in ms, modules that must not be imported)
+STATEMENTS = [
+    (f"import {PACKAGE}", '', 20, ('pandas', 'requests', 'exchange_calendars')),
+    (f"from {PACKAGE} import market_trading_info", DEPENDENCIES, 50, ('exchange_calendars',)),
+    (f"from {PACKAGE} import Ticker", DEPENDENCIES, 75, ('exchange_calendars',)),
+]
+
+REPEAT = 5
+
+
+def import_time(statement, baseline=''):
+    """
+    Return the import time of a statement in ms and the modules it imported.
+
+    Only the top-level imports the statement adds are counted, not the interpreter's
+    own startup imports (site, encodings, ...) nor those of the baseline run before it.
+    """
+    before = set(_top_level_imports(baseline or 'pass'))
+    best = float('inf')
+    for _ in range(REPEAT):
+        imports = _top_level_imports(f"{baseline}\n{statement}")
+        best = min(best, sum(cumulative for name, cumulative in imports.items() if name not in before))
+    return best / 1000, _imported_modules(statement)
+
+
+def _top_level_imports(statement):
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', statement],
+                            capture_output=True, text=True, env=_env(), check=True)
+    imports = {}
+    for line in result.stderr.splitlines():
+        # "import time: self [us] | cumulative | imported package", nested imports are indented
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        if not name[1:].startswith(' '):
+            imports[name.strip()] = int(cumulative)
+    return imports
+
+
+def _imported_modules(statement):
+    result = subprocess.run([sys.executable, '-c', f"{statement}\nimport sys\nprint('\\n'.join(sys.modules))"],
+                            capture_output=True, text=True, env=_env(), check=True)
+    return set(result.stdout.split())
+
+
+def _env():
+    # Make the package importable from the subprocesses, wherever they start.
+    package_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [os.path.dirname(package_dir), env.get('PYTHONPATH')]))
+    return env
+
+
+def main():
+    failures = []
+    dependencies, _ = import_time(DEPENDENCIES)
+    print(f"{DEPENDENCIES + ' (baseline, not budgeted)':45}{dependencies:>10.1f}")
+    print(f"{'statement':45}{'ms':>10}{'budget':>10}   (best of {REPEAT}, after the baseline)")
+    for statement, baseline, budget, unloaded in STATEMENTS:
+        elapsed, modules = import_time(statement, baseline)
+        loaded = [module for module in unloaded if module in modules]
+        print(f"{statement:45}{elapsed:>10.1f}{budget:>10}" + (f"   loads {', '.join(loaded)}" if loaded else ''))
+        if elapsed > budget or loaded:
+            failures.append(statement)
+    if failures:
+        print(f"Over budget: {', '.join(failures)}")
+    return not failures
+
+
+if __name__ == '__main__':
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,65 @@
+# Copyright 2024 JayC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Your Python code starts here
+
+
+"""
+Decode and parse time of every endpoint on fixture responses.
+
+Run from the directory containing twsepy:
+    python -m twsepy.benchmarks.bench_parse
+"""
+
+import json
+import time
+from twsepy import core
+from twsepy.benchmarks import fixtures
+
+DATE = '20240701'
+
+ENDPOINTS = [
+    ('MI_INDEX', fixtures.mi_index, lambda data: core.parse_daily_closing_prices(data, 8)),
+    ('FMTQIK', fixtures.fmtqik, lambda data: core.parse_market_trading_info(data, DATE)),
+    ('BWIBBU_d', fixtures.bwibbu_d, lambda data: core.parse_daily_stock_ratios(data, DATE, 'ALL')),
+    ('MI_MARGN', fixtures.mi_margn, lambda data: core.parse_margin_trading(data, DATE)),
+    ('T86', fixtures.t86, lambda data: core.parse_FIP_trading_data(data, DATE, 'ALLBUT0999')),
+]
+
+
+def best_of(func, *args, repeat=7):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    print(f"{'endpoint':10}{'bytes':>10}{'json':>10}{'decode':>10}{'parse':>10}{'typed':>10}   (ms, best of 7)")
+    for name, build, parse in ENDPOINTS:
+        content = json.dumps(build(DATE), ensure_ascii=False).encode('utf-8')
+        data = core.decode_json(content)
+        df = parse(data)
+        print(f"{name:10}{len(content):>10,}"
+              f"{best_of(json.loads, content):>10.1f}"
+              f"{best_of(core.decode_json, content):>10.1f}"
+              f"{best_of(parse, data):>10.1f}"
+              f"{best_of(core.convert_types, df):>10.1f}")
+    print(f"decode_json uses {'orjson' if core.orjson is not None else 'json'}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+# Copyright 2024 JayC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Your Python code starts here
+
+
+"""
+Tickers.download through a ProxyPool of local stand-in proxies.
+
+Every proxy has the same per-IP budget, so wall time should fall in proportion to the
+number of proxies. The last scenarios make one proxy answer 502 and stop another, and
+report how the requests were spread once they were ejected. No network is used.
+
+Run from the directory containing twsepy:
+    python -m twsepy.benchmarks.bench_proxies
+"""
+
+import io
+import time
+from contextlib import redirect_stdout
+from twsepy.ticker import Tickers
+from twsepy.utils import ProxyPool
+from twsepy.benchmarks.server import TWSEStandIn, StandInProxy
+from twsepy.benchmarks.fixtures import codes
+
+START_DATE = '20240601'
+END_DATE = '20240630'
+DATASETS = ['ratios', 'institutional']
+
+# Budget of each proxy, in requests per second.
+PROXY_RATE = 10
+
+SCENARIOS = [
+    # name, number of proxies, failing proxies, stopped proxies
+    ('1 proxy', 1, 0, 0),
+    ('2 proxies', 2, 0, 0),
+    ('4 proxies', 4, 0, 0),
+    ('4 proxies, 1 answering 502', 4, 1, 0),
+    ('4 proxies, 1 answering 502, 1 down', 4, 1, 1),
+]
+
+
+def run(stand_in, proxies):
+    pool = ProxyPool([proxy.url for proxy in proxies], rate_limit=PROXY_RATE, period=1, cooldown=60)
+    tickers = Tickers(codes(50), session=stand_in.session(pool_size=16, retries=3, backoff=0.01), proxy=pool)
+    stand_in.reset_counters()
+    start = time.perf_counter()
+    with redirect_stdout(io.StringIO()):  # silence the progress bar
+        tickers.download(START_DATE, END_DATE, max_workers=16, datasets=DATASETS)
+    return time.perf_counter() - start, pool.stats()
+
+
+def main(latency=0.02):
+    with TWSEStandIn(latency=latency) as stand_in:
+        stand_in.warm(START_DATE, END_DATE)
+
+        print(f"Tickers.download {START_DATE}-{END_DATE} {'+'.join(DATASETS)}, {PROXY_RATE} req/s per proxy, "
+              f"{latency * 1000:.0f}ms server latency")
+        print(f"{'scenario':38}{'wall s':>8}{'req':>6}{'req/s':>8}   requests per proxy (ejected *)")
+        for name, n_proxies, n_failing, n_stopped in SCENARIOS:
+            proxies = [StandInProxy() for _ in range(n_proxies)]
+            for i, proxy in enumerate(proxies):
+                proxy.start()
+                proxy.failing = i < n_failing
+                if n_failing <= i < n_failing + n_stopped:
+                    proxy.stop()
+            try:
+                elapsed, stats = run(stand_in, proxies)
+            finally:
+                for proxy in proxies:
+                    proxy.stop()
+            spread = ' '.join(f"{entry['requests']}{'' if entry['healthy'] else '*'}" for entry in stats)
+            print(f"{name:38}{elapsed:>8.2f}{stand_in.requests:>6}{stand_in.requests / elapsed:>8.1f}   {spread}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+# Copyright 2024 JayC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Your Python code starts here
+
+
+"""
+Memory and parse time of a full MI_INDEX table, object strings vs typed=True.
+
+Run from the directory containing twsepy:
+    python -m twsepy.benchmarks.bench_typed
+"""
+
+import time
+from twsepy.core import parse_daily_closing_prices
+from twsepy.dtypes import convert_types
+from twsepy.benchmarks.fixtures import mi_index
+
+
+def naive_convert(df):
+    # What callers do today: re-parse every cell in Python.
+    def parse(value):
+        try:
+            return float(value.replace(',', ''))
+        except ValueError:
+            return None
+    out = df.copy()
+    for i in range(2, 9):
+        out.isetitem(i, out.iloc[:, i].apply(parse))
+    return out
+
+
+def timed(func, *args, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def main(n_rows=6000):
+    payload = mi_index('20240701', n_rows)
+    raw, parse_time = timed(parse_daily_closing_prices, payload, 8)
+    typed, convert_time = timed(convert_types, raw)
+    _, naive_time = timed(naive_convert, raw)
+
+    raw_memory = raw.memory_usage(deep=True).sum()
+    typed_memory = typed.memory_usage(deep=True).sum()
+    print(f"MI_INDEX table 8, {len(raw)} rows")
+    print(f"{'':24}{'memory':>12}{'time':>12}")
+    print(f"{'strings':24}{raw_memory / 2 ** 20:>10.2f}MB{parse_time * 1000:>10.1f}ms")
+    print(f"{'typed=True':24}{typed_memory / 2 ** 20:>10.2f}MB{(parse_time + convert_time) * 1000:>10.1f}ms")
+    print(f"{'  convert_types only':24}{'':>12}{convert_time * 1000:>10.1f}ms  (all {raw.shape[1]} columns)")
+    print(f"{'per-cell re-parse':24}{'':>12}{naive_time * 1000:>10.1f}ms  (7 columns only)")
+    print(f"memory ratio {raw_memory / typed_memory:.1f}x")
+    print(typed.dtypes.value_counts().to_string())
+
+
+if __name__ == '__main__':
+    main()
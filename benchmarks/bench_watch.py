@@ -0,0 +1,98 @@
+# Copyright 2024 JayC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Your Python code starts here
+
+
+"""
+Waiting for today's tables: watch() against a loop over the core functions.
+
+The stand-in server publishes each endpoint a few seconds after it starts, time being
+scaled down from the real evening schedule. The loop polls every missing table at a
+fixed interval from the start; watch() starts each table shortly before its scheduled
+time, polls it often at first, then backs off. The benchmark reports requests, 304
+answers, bytes and the delay from publication to each table reaching the caller. No
+network is used.
+
+Run from the directory containing twsepy:
+    python -m twsepy.benchmarks.bench_watch
+"""
+
+import io
+import time
+from datetime import datetime, timedelta
+from contextlib import redirect_stdout
+from twsepy.cache import TAIPEI
+from twsepy.core import daily_closing_prices, margin_trading, daily_stock_ratios, FIP_trading_data
+from twsepy.utils import RateLimiter
+from twsepy.watcher import watch
+from twsepy.benchmarks.server import TWSEStandIn
+
+# Seconds after the server starts at which each endpoint is published.
+PUBLISH_DELAYS = {'MI_INDEX': 1.0, 'BWIBBU_d': 2.0, 'T86': 3.0, 'MI_MARGN': 5.0}
+DATASET_ENDPOINTS = {'prices': 'MI_INDEX', 'ratios': 'BWIBBU_d', 'institutional': 'T86', 'margin': 'MI_MARGN'}
+
+# The loop polls every missing table at a fixed interval.
+LOOP_INTERVAL = 0.5
+# watch() starts polling a table this long before it is published, as its schedule would.
+SCHEDULE_LEAD = 0.5
+LOOP_FUNCTIONS = {
+    'prices': lambda date, **kw: daily_closing_prices(date, 'ALL', 8, **kw),
+    'margin': lambda date, **kw: margin_trading(date, **kw),
+    'ratios': lambda date, **kw: daily_stock_ratios(date, 'ALL', **kw),
+    'institutional': lambda date, **kw: FIP_trading_data(date, 'ALLBUT0999', **kw),
+}
+
+
+def poll_loop(date, session, rate_limiter):
+    landed = {}
+    while len(landed) < len(LOOP_FUNCTIONS):
+        for dataset, fetch in LOOP_FUNCTIONS.items():
+            if dataset not in landed and not fetch(date, rate_limiter=rate_limiter, cache=False, session=session).empty:
+                landed[dataset] = time.monotonic()
+        time.sleep(LOOP_INTERVAL)
+    return landed
+
+
+def poll_watch(date, session, rate_limiter):
+    now = datetime.now(TAIPEI)
+    schedule = {dataset: (now + timedelta(seconds=PUBLISH_DELAYS[endpoint] - SCHEDULE_LEAD)).time()
+                for dataset, endpoint in DATASET_ENDPOINTS.items()}
+    landed = {}
+    watcher = watch(date, list(LOOP_FUNCTIONS), schedule=schedule, min_interval=0.1, max_interval=LOOP_INTERVAL,
+                    backoff=1.5, rate_limiter=rate_limiter, session=session)
+    for dataset, _ in watcher:
+        landed[dataset] = time.monotonic()
+    return landed
+
+
+def main(latency=0.01):
+    date = datetime.now(TAIPEI).strftime('%Y%m%d')
+    print(f"Waiting for {', '.join(PUBLISH_DELAYS)} to be published, {latency * 1000:.0f}ms server latency")
+    print(f"{'approach':16}{'req':>6}{'304':>6}{'MB sent':>9}" + ''.join(f"{name + ' ms':>18}" for name in LOOP_FUNCTIONS))
+    for name, func in [('core loop', poll_loop), ('watch', poll_watch)]:
+        stand_in = TWSEStandIn(latency=latency, publish_delays=PUBLISH_DELAYS)
+        stand_in.warm(date, date)
+        with stand_in:
+            session = stand_in.session()
+            with redirect_stdout(io.StringIO()):  # the core functions print every empty poll
+                landed = func(date, session, RateLimiter(enabled=False))
+            delays = {dataset: (landed[dataset] - stand_in.started - PUBLISH_DELAYS[DATASET_ENDPOINTS[dataset]]) * 1000
+                      for dataset in landed}
+            print(f"{name:16}{stand_in.requests:>6}{stand_in.not_modified:>6}{stand_in.bytes_sent / 2 ** 20:>9.2f}"
+                  + ''.join(f"{delays[dataset]:>18.0f}" for dataset in LOOP_FUNCTIONS))
+
+
+if __name__ == '__main__':
+    main()
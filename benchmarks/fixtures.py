@@ -0,0 +1,209 @@
+# Copyright 2024 JayC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Your Python code starts here
+
+
+"""
+TWSE response payloads for the benchmarks.
+
+The payloads follow the layout of the real responses (same fields, table positions,
+thousands separators, "--" placeholders and HTML in the MI_INDEX sign column), with
+deterministic random values so runs are comparable.
+"""
+
+import random
+import calendar
+from functools import lru_cache
+
+MI_INDEX_FIELDS = [
+    '證券代號', '證券名稱', '成交股數', '成交筆數', '成交金額', '開盤價', '最高價', '最低價', '收盤價',
+    '漲跌(+/-)', '漲跌價差', '最後揭示買價', '最後揭示買量', '最後揭示賣價', '最後揭示賣量', '本益比'
+]
+SIGNS = ['<p style= color:red>+</p>', '<p style= color:green>-</p>', '<p> </p>', '<p>X</p>']
+
+
+def codes(n_rows, seed=0):
+    """
+    Return `n_rows` security codes: stocks and ETFs first, then warrants.
+    """
+    rng = random.Random(seed)
+    stocks = ['0050', '0056', '2330', '2454', '2317', '1101', '1102']
+    stocks += [str(code) for code in rng.sample(range(1200, 9999), min(1500, n_rows))]
+    stocks = list(dict.fromkeys(stocks))[:n_rows]
+    warrants = [f"{rng.randint(0, 99):02d}{rng.randint(0, 9999):04d}" for _ in range(n_rows - len(stocks))]
+    return stocks + warrants
+
+
+def _number(rng, low, high):
+    return f"{rng.randint(low, high):,}"
+
+
+def _price(rng):
+    return f"{rng.uniform(5, 1500):,.2f}"
+
+
+def mi_index(date, n_rows=6000, seed=0):
+    """
+    Payload of afterTrading/MI_INDEX with type=ALL; the closing prices are table 8.
+    """
+    rows = [_mi_index_row(code, date, seed) for code in codes(n_rows, seed)]
+    tables = [{'title': f"{date} 表{i}", 'fields': ['指數', '收盤指數'], 'data': [['發行量加權股價指數', '23,058.57']]}
+              for i in range(8)]
+    tables.append({'title': f"{date} 每日收盤行情(全部)", 'fields': MI_INDEX_FIELDS, 'data': rows})
+    return {'stat': 'OK', 'date': date, 'tables': tables}
+
+
+def _mi_index_row(code, date, seed):
+    # One generator per (code, date), so the per-stock payloads can repeat the same values.
+    rng = random.Random(f"{seed}{date}{code}")
+    traded = rng.random() > 0.1
+    return [
+        code, f"名稱{code}", _number(rng, 0, 50000000), _number(rng, 0, 100000), _number(rng, 0, 10000000000),
+        _price(rng) if traded else '--', _price(rng) if traded else '--', _price(rng) if traded else '--',
+        _price(rng) if traded else '--', rng.choice(SIGNS), f"{rng.uniform(0, 50):.2f}",
+        _price(rng), _number(rng, 0, 500), _price(rng), _number(rng, 0, 500),
+        f"{rng.uniform(0, 80):.2f}" if rng.random() > 0.3 else '0.00',
+    ]
+
+
+def stock_day(date, stock_no, seed=0):
+    """
+    Payload of afterTrading/STOCK_DAY: one stock, one row per weekday of the month, with
+    the same values as its MI_INDEX rows.
+    """
+    year, month = int(date[:4]) - 1911, int(date[4:6])
+    rows = []
+    for day in _weekdays(date):
+        row = _mi_index_row(stock_no, day, seed)
+        rows.append([f"{year}/{month:02d}/{day[6:]}", row[2], row[4], row[5], row[6], row[7], row[8], row[10], row[3]])
+    return {'stat': 'OK', 'date': date, 'title': f"{year}年{month:02d}月 {stock_no} 名稱{stock_no} 各日成交資訊",
+            'fields': ['日期', '成交股數', '成交金額', '開盤價', '最高價', '最低價', '收盤價', '漲跌價差', '成交筆數'],
+            'data': rows, 'total': len(rows)}
+def fmtqik(date, seed=0):
+    """
+    Payload of afterTrading/FMTQIK: one row per trading day of the month.
+    """
+    rng = random.Random(f"{seed}{date}")
+    year, month = int(date[:4]) - 1911, int(date[4:6])
+    rows = [[f"{year}/{month:02d}/{day:02d}", _number(rng, 5000000000, 15000000000), _number(rng, 200000000000, 600000000000),
+             _number(rng, 2000000, 4000000), f"{rng.uniform(20000, 24000):,.2f}", f"{rng.uniform(-300, 300):.2f}"]
+            for day in range(1, 23)]
+    return {'stat': 'OK', 'date': date, 'title': f"{year}年{month:02d}月市場成交資訊",
+            'fields': ['日期', '成交股數', '成交金額', '成交筆數', '發行量加權股價指數', '漲跌點數'], 'data': rows}
+
+
+def bwibbu_d(date, n_rows=1000, seed=0):
+    """
+    Payload of afterTrading/BWIBBU_d with selectType=ALL.
+    """
+    rows = [_bwibbu_row(code, date, seed) for code in codes(n_rows, seed)]
+    return {'stat': 'OK', 'date': date, 'title': f"{date} 個股日本益比、殖利率及股價淨值比",
+            'fields': ['證券代號', '證券名稱', '殖利率(%)', '股利年度', '本益比', '股價淨值比', '財報年/季'], 'data': rows}
+
+
+def _bwibbu_row(code, date, seed):
+    rng = random.Random(f"{seed}{date}{code}")
+    return [code, f"名稱{code}", f"{rng.uniform(0, 10):.2f}", '112', f"{rng.uniform(5, 60):.2f}" if rng.random() > 0.2 else '-',
+            f"{rng.uniform(0.3, 10):.2f}", '113/1']
+
+
+def bwibbu(date, stock_no, seed=0):
+    """
+    Payload of afterTrading/BWIBBU: one stock, one row per weekday of the month, with the
+    same values as its BWIBBU_d rows.
+    """
+    year, month = int(date[:4]) - 1911, int(date[4:6])
+    rows = []
+    for day in _weekdays(date):
+        row = _bwibbu_row(stock_no, day, seed)
+        rows.append([f"{year}年{month:02d}月{day[6:]}日", row[2], row[3], row[4], row[5], row[6]])
+    return {'stat': 'OK', 'date': date, 'title': f"{year}年{month:02d}月 {stock_no} 名稱{stock_no} 個股日本益比、殖利率及股價淨值比",
+            'fields': ['日期', '殖利率(%)', '股利年度', '本益比', '股價淨值比', '財報年/季'], 'data': rows}
+
+
+def _weekdays(date):
+    year, month = int(date[:4]), int(date[4:6])
+    return [f"{year:04d}{month:02d}{day:02d}" for day in range(1, calendar.monthrange(year, month)[1] + 1)
+            if calendar.weekday(year, month, day) < 5]
+
+
+def mi_margn(date, n_rows=1300, seed=0):
+    """
+    Payload of marginTrading/MI_MARGN with selectType=STOCK; the per-stock table is table 1.
+    """
+    rng = random.Random(f"{seed}{date}")
+    fields = ['代號', '名稱', '買進', '賣出', '現金償還', '前日餘額', '今日餘額', '次一營業日限額',
+              '買進', '賣出', '現券償還', '前日餘額', '今日餘額', '次一營業日限額', '資券互抵', '註記']
+    rows = [[code, f"名稱{code}"] + [_number(rng, 0, 500000) for _ in range(13)] + [rng.choice(['', ' ', 'X', 'O'])]
+            for code in codes(n_rows, seed)]
+    summary = {'title': '信用交易統計', 'fields': ['項目', '買進', '賣出', '現金(券)償還', '前日餘額', '今日餘額'],
+               'data': [['融資(交易單位)', '192,375', '191,185', '5,490', '6,719,124', '6,714,824']]}
+    return {'stat': 'OK', 'date': date, 'tables': [summary, {'title': '融資融券彙總', 'fields': fields, 'data': rows}]}
+
+
+def t86(date, n_rows=1300, seed=0):
+    """
+    Payload of fund/T86 with selectType=ALLBUT0999.
+    """
+    rng = random.Random(f"{seed}{date}")
+    fields = ['證券代號', '證券名稱', '外陸資買進股數(不含外資自營商)', '外陸資賣出股數(不含外資自營商)', '外陸資買賣超股數(不含外資自營商)',
+              '外資自營商買進股數', '外資自營商賣出股數', '外資自營商買賣超股數', '投信買進股數', '投信賣出股數', '投信買賣超股數',
+              '自營商買賣超股數', '自營商買進股數(自行買賣)', '自營商賣出股數(自行買賣)', '自營商買賣超股數(自行買賣)',
+              '自營商買進股數(避險)', '自營商賣出股數(避險)', '自營商買賣超股數(避險)', '三大法人買賣超股數']
+    rows = [[code.ljust(6), f"名稱{code}"] + [_number(rng, -30000000, 30000000) for _ in range(17)]
+            for code in codes(n_rows, seed)]
+    return {'stat': 'OK', 'date': date, 'title': f"{date} 三大法人買賣超日報", 'fields': fields, 'data': rows}
+
+
+def no_data():
+    """
+    Payload TWSE returns for a date without data.
+    """
+    return {'stat': '很抱歉，沒有符合條件的資料!'}
+
+
+ENDPOINTS = {
+    'afterTrading/MI_INDEX': mi_index,
+    'afterTrading/FMTQIK': fmtqik,
+    'afterTrading/BWIBBU_d': bwibbu_d,
+    'marginTrading/MI_MARGN': mi_margn,
+    'fund/T86': t86,
+}
+
+# Per-stock endpoints, built from the date and stockNo parameters.
+STOCK_ENDPOINTS = {
+    'afterTrading/STOCK_DAY': stock_day,
+    'afterTrading/BWIBBU': bwibbu,
+}
+
+
+def payload(path, params):
+    """
+    Return the payload for an endpoint path (e.g. '/rwd/zh/fund/T86') and its parameters.
+    """
+    for endpoint, build in ENDPOINTS.items():
+        if path.rstrip('/').endswith(endpoint):
+            return build(str(params.get('date', '')))
+    for endpoint, build in STOCK_ENDPOINTS.items():
+        if path.rstrip('/').endswith(endpoint):
+            if params.get('stockNo') not in _listed_codes():
+                return no_data()
+            return build(str(params.get('date', '')), params['stockNo'])
+    return None
+
+
+@lru_cache(maxsize=1)
+def _listed_codes():
+    return frozenset(codes(6000))
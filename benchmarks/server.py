@@ -0,0 +1,296 @@
+# Copyright 2024 JayC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Your Python code starts here
+
+
+"""
+Local stand-in for the TWSE API, serving fixture payloads with configurable
+latency and error injection.
+"""
+
+import sys
+import gzip
+import json
+import hashlib
+import time
+import random
+import threading
+import http.client
+from functools import lru_cache
+from urllib.parse import urlsplit, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from requests.adapters import HTTPAdapter
+from twsepy.config import BASE_URL
+from twsepy.utils import Session
+from twsepy.benchmarks import fixtures
+
+
+@lru_cache(maxsize=1024)
+def _encoded_payload(path, date, compressed, stock_no=None):
+    data = fixtures.payload(path, {'date': date, 'stockNo': stock_no})
+    if data is None:
+        return None
+    body = json.dumps(data, ensure_ascii=False).encode('utf-8')
+    return gzip.compress(body, compresslevel=1) if compressed else body
+
+
+@lru_cache(maxsize=1024)
+def _etag(body):
+    return f'"{hashlib.md5(body).hexdigest()}"'
+
+
+class TWSEStandIn:
+    """
+    Threaded HTTP server answering the TWSE endpoints from benchmarks.fixtures.
+
+    Use it as a context manager; `url` replaces config.BASE_URL and `session()`
+    returns a Session whose requests to BASE_URL are sent to the stand-in.
+    """
+
+    def __init__(self, latency=0.0, error_rate=0.0, error_status=503, no_data_dates=(), seed=0, publish_delays=None):
+        """
+        Initialize TWSEStandIn instance.
+
+        :param latency: Seconds added to every response.
+        :param error_rate: Fraction of requests answered with error_status.
+        :param error_status: Status code of the injected errors.
+        :param no_data_dates: Dates (YYYYMMDD) answered with TWSE's "no data" payload.
+        :param seed: Seed of the error injection.
+        :param publish_delays: Optional dictionary of endpoint name (e.g. 'T86') -> seconds after
+            start() during which the endpoint answers with the "no data" payload, as before TWSE
+            publishes the day's table.
+        """
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.no_data_dates = set(no_data_dates)
+        self.publish_delays = dict(publish_delays or {})
+        self.started = None
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+        self.not_modified = 0
+        self.bytes_sent = 0
+        self.server = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def start(self):
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'  # keep-alive
+
+            def do_GET(self):
+                stand_in._handle(self)
+
+            def log_message(self, format, *args):
+                pass
+
+        class Server(ThreadingHTTPServer):
+            def handle_error(self, request, client_address):
+                if not isinstance(sys.exc_info()[1], ConnectionError):  # Clients hanging up, e.g. cancelled fetches
+                    super().handle_error(request, client_address)
+
+        self.started = time.monotonic()
+        self.server = Server(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def stop(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address
+        return f"http://{host}:{port}{urlsplit(BASE_URL).path}"
+
+    def session(self, **kwargs):
+        """
+        Return a Session that sends requests for BASE_URL to the stand-in.
+
+        :param kwargs: Passed to utils.Session.
+        """
+        session = Session(**kwargs)
+        pool_size = kwargs.get('pool_size', 10)
+        adapter = _RedirectAdapter(BASE_URL, self.url, pool_connections=pool_size, pool_maxsize=pool_size)
+        session.mount(BASE_URL, adapter)
+        return session
+
+    def warm(self, start_date, end_date):
+        """
+        Build the payloads of every endpoint between start_date and end_date ahead of
+        time, so fixture generation is not measured.
+        """
+        import pandas as pd
+        for date in pd.date_range(start_date, end_date):
+            for endpoint in fixtures.ENDPOINTS:
+                for compressed in (False, True):
+                    _encoded_payload(f"{urlsplit(BASE_URL).path}/{endpoint}", date.strftime('%Y%m%d'), compressed)
+
+    def reset_counters(self):
+        with self.lock:
+            self.requests = 0
+            self.errors = 0
+            self.not_modified = 0
+            self.bytes_sent = 0
+
+    def _handle(self, handler):
+        if self.latency:
+            time.sleep(self.latency)
+
+        parts = urlsplit(handler.path)
+        compressed = 'gzip' in handler.headers.get('Accept-Encoding', '')
+        params = {key: values[0] for key, values in parse_qs(parts.query).items()}
+        with self.lock:
+            self.requests += 1
+            failed = self.random.random() < self.error_rate
+            if failed:
+                self.errors += 1
+
+        if failed:
+            status, body = self.error_status, b'Service Unavailable'
+        elif params.get('date') in self.no_data_dates or not self._published(parts.path):
+            body = json.dumps(fixtures.no_data(), ensure_ascii=False).encode('utf-8')
+            status, body = 200, gzip.compress(body, compresslevel=1, mtime=0) if compressed else body
+        else:
+            body = _encoded_payload(parts.path, params.get('date', ''), compressed, params.get('stockNo'))
+            status = 200 if body is not None else 404
+            body = body or b'Not Found'
+
+        headers = {'Content-Type': 'application/json;charset=UTF-8'}
+        if status == 200:
+            # Conditional requests: an unchanged body is answered with an empty 304.
+            headers['ETag'] = _etag(body)
+            if handler.headers.get('If-None-Match') == headers['ETag']:
+                status, body = 304, b''
+                with self.lock:
+                    self.not_modified += 1
+            elif compressed:
+                headers['Content-Encoding'] = 'gzip'
+        with self.lock:
+            self.bytes_sent += len(body)
+
+        handler.send_response(status)
+        for key, value in headers.items():
+            handler.send_header(key, value)
+        handler.send_header('Content-Length', str(len(body)))
+        handler.end_headers()
+        handler.wfile.write(body)
+
+    def _published(self, path):
+        delay = self.publish_delays.get(path.rstrip('/').rsplit('/', 1)[-1])
+        return delay is None or time.monotonic() - self.started >= delay
+
+
+class StandInProxy:
+    """
+    Threaded forward HTTP proxy, a local stand-in for one egress IP of a ProxyPool.
+
+    Use it as a context manager; `url` is the proxy URL to put in the pool. Setting
+    `failing` makes it answer every request with 502, and stop() makes connections to it
+    fail, to exercise ejection and re-admission.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.failing = False
+        self.server = None
+        self.address = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def start(self):
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                stand_in._forward(self)
+
+            def log_message(self, format, *args):
+                pass
+
+        # Restarting after stop() binds the same port again, as a proxy coming back would.
+        self.server = ThreadingHTTPServer(self.address or ('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        self.address = self.server.server_address
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def stop(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+    @property
+    def url(self):
+        host, port = self.address
+        return f"http://{host}:{port}"
+
+    def _forward(self, handler):
+        with self.lock:
+            self.requests += 1
+        if self.failing:
+            status, headers, body = 502, {}, b'Bad Gateway'
+        else:
+            target = urlsplit(handler.path)
+            connection = http.client.HTTPConnection(target.netloc, timeout=30)
+            try:
+                connection.request('GET', target.path + (f"?{target.query}" if target.query else ''),
+                                   headers={key: value for key, value in handler.headers.items()
+                                            if key.lower() not in ('proxy-connection', 'connection')})
+                response = connection.getresponse()
+                status, body = response.status, response.read()
+                headers = {key: value for key, value in response.getheaders()
+                           if key.lower() not in ('connection', 'transfer-encoding', 'content-length')}
+            finally:
+                connection.close()
+
+        handler.send_response(status)
+        for key, value in headers.items():
+            handler.send_header(key, value)
+        handler.send_header('Content-Length', str(len(body)))
+        handler.end_headers()
+        handler.wfile.write(body)
+
+
+class _RedirectAdapter(HTTPAdapter):
+    __attrs__ = HTTPAdapter.__attrs__ + ['prefix', 'target']  # Kept when the session is sent to worker processes
+
+    def __init__(self, prefix, target, **kwargs):
+        super().__init__(**kwargs)
+        self.prefix = prefix
+        self.target = target
+
+    def send(self, request, **kwargs):
+        request.url = self.target + request.url[len(self.prefix):]
+        return super().send(request, **kwargs)
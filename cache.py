@@ -0,0 +1,263 @@
+# Copyright 2024 JayC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Your Python code starts here
+
+
+import os
+import gzip
+import json
+import time
+import hashlib
+import threading
+from datetime import datetime, timedelta, timezone
+
+TAIPEI = timezone(timedelta(hours=8))
+
+# Endpoints whose `date` parameter selects a whole month rather than one day.
+MONTHLY_ENDPOINTS = ('FMTQIK', 'STOCK_DAY', 'BWIBBU')
+
+
+class CachedResponse:
+    """
+    Minimal stand-in for requests.Response served from the cache.
+
+    final is False for an entry written before the requested date closed: TWSE may have
+    published the data since, so an empty answer in it proves nothing.
+    """
+
+    def __init__(self, text, final=True):
+        self.status_code = 200
+        self.text = text
+        self.content = text.encode('utf-8')
+        self.final = final
+
+    def json(self):
+        return json.loads(self.text)
+
+
+class ResponseCache:
+    """
+    On-disk cache of raw TWSE JSON responses.
+
+    Entries are keyed by (endpoint URL, date, type/selectType, stockNo) and stored gzip-compressed.
+    Entries written after the requested date closed never expire. Entries written before,
+    during the session or before TWSE published the day's tables, expire after `ttl`
+    seconds. The least recently used entries are evicted once the cache grows beyond
+    `max_size` bytes.
+    """
+
+    def __init__(self, directory=None, ttl=600, max_size=1024 * 1024 * 1024):
+        """
+        Initialize ResponseCache instance.
+
+        :param directory: Cache directory. Defaults to ~/.cache/twsepy.
+        :param ttl: Lifetime in seconds of entries written before the requested date closed.
+        :param max_size: Maximum total size of the cache in bytes.
+        """
+        self.directory = os.path.expanduser(directory or os.path.join('~', '.cache', 'twsepy'))
+        self.ttl = ttl
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+        self.size = sum(size for _, size, _ in self._entries())
+
+    def key(self, url, params):
+        """
+        Build the cache key of a request.
+
+        :param url: The requested URL.
+        :param params: The request parameters.
+        :return: Hex digest identifying (url, date, type/selectType, stockNo).
+        """
+        params = params or {}
+        select_type = params.get('type', params.get('selectType', ''))
+        raw = f"{url}|{params.get('date', '')}|{select_type}"
+        if 'stockNo' in params:  # Per-stock endpoints
+            raw += f"|{params['stockNo']}"
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+    def get(self, url, params):
+        """
+        Return the cached response text, or None on a miss or an expired entry.
+        """
+        entry = self.get_entry(url, params)
+        return entry[0] if entry is not None else None
+
+    def get_entry(self, url, params):
+        """
+        Like get, but also tell whether the entry is final.
+
+        :return: A (text, final) tuple, or None on a miss or an expired entry. final is True
+            when the entry was written after the requested date closed.
+        """
+        path = self._path(self.key(url, params))
+        try:
+            modified = os.path.getmtime(path)
+            final = self.is_final(url, params, modified)
+            if not final and time.time() - modified > self.ttl:
+                raise FileNotFoundError(path)
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                text = f.read()
+        except (OSError, EOFError):
+            with self.lock:
+                self.misses += 1
+            return None
+
+        os.utime(path, (time.time(), modified))  # atime drives LRU eviction
+        with self.lock:
+            self.hits += 1
+        return text, final
+
+    def set(self, url, params, text):
+        """
+        Store the response text of a request.
+        """
+        path = self._path(self.key(url, params))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        old_size = os.path.getsize(path) if os.path.exists(path) else 0
+
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+
+        with self.lock:
+            self.size += os.path.getsize(path) - old_size
+            if self.size > self.max_size:
+                self._evict()
+
+    def delete(self, url, params):
+        """
+        Remove the entry of a request, so the next one is sent to TWSE.
+
+        :return: True if there was an entry.
+        """
+        path = self._path(self.key(url, params))
+        try:
+            size = os.path.getsize(path)
+            os.remove(path)
+        except OSError:
+            return False
+        with self.lock:
+            self.size -= size
+        return True
+
+    def is_final(self, url, params, modified):
+        """
+        Check whether an entry written at `modified` (seconds since the epoch) holds the
+        final response: it was written after the requested date closed.
+        """
+        closes = closed_at(url, params)
+        return closes is not None and modified >= closes
+
+    def is_closed(self, url, params):
+        """
+        Check whether the requested date lies entirely before the current session,
+        in which case its response can no longer change.
+        """
+        return is_closed(url, params)
+
+    def clear(self):
+        """
+        Remove every entry and reset the counters.
+        """
+        with self.lock:
+            for path, _, _ in self._entries():
+                os.remove(path)
+            self.size = 0
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """
+        Return hit/miss counters and the current cache size.
+        """
+        with self.lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / total if total else 0.0,
+                'size': self.size,
+            }
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], f"{key}.json.gz")
+
+    def _entries(self):
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith('.json.gz'):
+                    path = os.path.join(root, name)
+                    stat = os.stat(path)
+                    yield path, stat.st_size, stat.st_atime
+
+    def _evict(self):
+        # Drop the least recently used entries until the cache is back under 90% of max_size.
+        target = self.max_size * 0.9
+        for path, size, _ in sorted(self._entries(), key=lambda entry: entry[2]):
+            if self.size <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            self.size -= size
+
+
+# Global default cache, disabled until set_default_cache is called.
+default_cache = None
+
+
+def set_default_cache(cache):
+    """
+    Set the cache used by the core functions when none is passed explicitly.
+
+    :param cache: A ResponseCache instance, or None to disable caching.
+    """
+    global default_cache
+    default_cache = cache
+
+
+def is_closed(url, params):
+    """
+    Check whether the date requested from an endpoint lies entirely before the current
+    session, in which case its response can no longer change. Monthly endpoints are
+    closed once the month is over.
+    """
+    closes = closed_at(url, params)
+    return closes is not None and time.time() >= closes
+
+
+def closed_at(url, params):
+    """
+    Return when the date requested from an endpoint closes, in seconds since the epoch:
+    midnight (Taipei) after the date, or after the month for monthly endpoints. None when
+    the request has no YYYYMMDD date.
+    """
+    date = str((params or {}).get('date', ''))
+    if len(date) != 8 or not date.isdigit():
+        return None
+    try:
+        day = datetime.strptime(date, '%Y%m%d').replace(tzinfo=TAIPEI)
+    except ValueError:
+        return None
+
+    if url.rstrip('/').endswith(MONTHLY_ENDPOINTS):
+        month = day.replace(day=1) + timedelta(days=32)
+        return month.replace(day=1).timestamp()
+    return (day + timedelta(days=1)).timestamp()
@@ -1,10 +1,32 @@
-import exchange_calendars as ecals
+import threading
+from . import no_data
+
 
 class CalendarManager:
     def __init__(self, calendar_name="XTAI"):
+        import exchange_calendars as ecals  # Imported on first use, it takes longer than the rest of twsepy
         self.calendar = ecals.get_calendar(calendar_name)
 
     def get_trading_dates(self, start_date, end_date):
         schedule = self.calendar.schedule.loc[start_date:end_date]
         trading_dates = schedule.index
+        if no_data.default_index is not None:
+            # Drop the days TWSE turned out to be closed on, e.g. typhoon closures.
+            closed = no_data.default_index.closed_dates()
+            if closed:
+                trading_dates = trading_dates[~trading_dates.strftime('%Y%m%d').isin(closed)]
         return trading_dates
+
+
+_calendar_managers = {}
+_calendar_managers_lock = threading.Lock()
+
+
+def get_calendar_manager(calendar_name="XTAI"):
+    """
+    Return the CalendarManager of a calendar, building it on first use and reusing it afterwards.
+    """
+    with _calendar_managers_lock:
+        if calendar_name not in _calendar_managers:
+            _calendar_managers[calendar_name] = CalendarManager(calendar_name)
+        return _calendar_managers[calendar_name]
@@ -18,15 +18,46 @@
 import pandas as pd
 from .config import DEFAULT_HEADERS, BASE_URL
 from .exceptions import RequestFailedException, JSONDecodeException
-from twsepy.utils import RateLimiter
-from .utils import limited_request, remove_html_tags
+from .utils import limited_request, remove_html_tags_series, default_rate_limiter, SingleFlight
+from .dtypes import convert_types
+from .metrics import default_metrics
+from .no_data import is_known_empty, record_empty
 import json
+import inspect
+import functools
+try:
+    import orjson
+except ImportError:  # orjson is optional, json is used without it
+    orjson = None
 
-# Global default rate limiter 
-# No idea how to remove it.
-default_rate_limiter = RateLimiter(rate_limit=5, period=5, enabled = False)
+# Arguments that do not change the response, left out of the single-flight key.
+TRANSPORT_ARGUMENTS = ('proxy', 'rate_limiter', 'cache', 'session')
 
-def daily_closing_prices(date, select_type='ALL', table_index=8, proxy=None, rate_limiter=default_rate_limiter):
+_in_flight = SingleFlight(copy=pd.DataFrame.copy)
+
+
+def coalesce(func):
+    """
+    Share one request among concurrent identical calls of a core function.
+
+    Calls with the same endpoint, date, type and parsing options that overlap in time
+    send a single request; the callers that waited get their own copy of the DataFrame.
+    """
+    signature = inspect.signature(func)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        key = (func.__name__,) + tuple(value for name, value in bound.arguments.items() if name not in TRANSPORT_ARGUMENTS)
+        df, _ = _in_flight.do(key, func, *args, **kwargs)
+        return df
+
+    return wrapper
+
+
+@coalesce
+def daily_closing_prices(date, select_type='ALL', table_index=8, proxy=None, rate_limiter=default_rate_limiter, cache=None, session=None, typed=False):
     """
     Fetch daily closing prices from the TWSE.
 
@@ -36,7 +67,11 @@ def daily_closing_prices(date, select_type='ALL', table_index=8, proxy=None, rat
         :reference: https://www.twse.com.tw/zh/trading/historical/mi-index.html
             :category: "ALL". Index start from 0.
             :more information in README.md
-    :param proxy: Optional proxy settings for the request.
+    :param proxy: Optional proxy settings for the request, or a ProxyPool.
+    :param rate_limiter: Rate limiter shared by the requests.
+    :param cache: Optional ResponseCache for the raw response.
+    :param session: Optional Session for the request.
+    :param typed: Convert the columns to numeric, datetime64 and categorical dtypes.
     :return type:  DataFrame.
     """
     url = f"{BASE_URL}/afterTrading/MI_INDEX"
@@ -46,34 +81,34 @@ def daily_closing_prices(date, select_type='ALL', table_index=8, proxy=None, rat
         'response': 'json'
     }
 
-    response = limited_request(url, headers=DEFAULT_HEADERS, params=params, proxy=proxy, rate_limiter=default_rate_limiter)
+    if is_known_empty(url, params):  # Recorded by a NoDataIndex, see no_data.py
+        return pd.DataFrame()
+
+    response = limited_request(url, headers=DEFAULT_HEADERS, params=params, proxy=proxy, rate_limiter=rate_limiter, cache=cache, session=session)
     if response.status_code == 200:
-        try:
-            data = response.json()
-        except json.JSONDecodeError:
-            raise JSONDecodeException("Failed to parse JSON response.", response.text)
-
-        if table_index < len(data.get('tables', [])):
-            table = data['tables'][table_index]
-            df = pd.DataFrame(table['data'], columns=table['fields'])
-            if len(df.columns) > 9:
-                df.iloc[:, 9] = df.iloc[:, 9].apply(remove_html_tags)
-            return df
-        else:
-            print(f"Table index {table_index} is out of range.")
-            return pd.DataFrame()
+        with default_metrics.timer('parse_seconds', 'MI_INDEX'):
+            data = decode_json(response.content)
+            if not data.get('tables'):
+                record_empty(url, params, response)
+            df = parse_daily_closing_prices(data, table_index)
+            return convert_types(df) if typed else df
     else:
         raise RequestFailedException(
             f"Failed to retrieve data for {date} with type {select_type}. Status code: {response.status_code}")
 
 
-def market_trading_info(date, proxy=None, rate_limiter=default_rate_limiter):
+@coalesce
+def market_trading_info(date, proxy=None, rate_limiter=default_rate_limiter, cache=None, session=None, typed=False):
     """
     Fetch market trading information from the TWSE.
     :reference: https://www.twse.com.tw/zh/trading/historical/fmtqik.html
 
     :param date: The date for which to fetch the data (format: YYYYMMDD).
-    :param proxy: Optional proxy settings for the request.
+    :param proxy: Optional proxy settings for the request, or a ProxyPool.
+    :param rate_limiter: Rate limiter shared by the requests.
+    :param cache: Optional ResponseCache for the raw response.
+    :param session: Optional Session for the request.
+    :param typed: Convert the columns to numeric, datetime64 and categorical dtypes.
     :return type:  DataFrame.
     """
     url = f"{BASE_URL}/afterTrading/FMTQIK"
@@ -82,31 +117,33 @@ def market_trading_info(date, proxy=None, rate_limiter=default_rate_limiter):
         'response': 'json'
     }
 
-    response = limited_request(url, headers=DEFAULT_HEADERS, params=params, proxy=proxy, rate_limiter=default_rate_limiter)
+    if is_known_empty(url, params):
+        return pd.DataFrame()
+
+    response = limited_request(url, headers=DEFAULT_HEADERS, params=params, proxy=proxy, rate_limiter=rate_limiter, cache=cache, session=session)
     if response.status_code == 200:
-        try:
-            data = response.json()
-        except json.JSONDecodeError:
-            raise JSONDecodeException("Failed to parse JSON response.", response.text)
-
-        if 'data' in data:
-            df = pd.DataFrame(data['data'], columns=data['fields'])
-            return df
-        else:
-            print(f"No data found for {date}.")
-            return pd.DataFrame()
+        with default_metrics.timer('parse_seconds', 'FMTQIK'):
+            df = parse_market_trading_info(decode_json(response.content), date)
+            if df.empty:
+                record_empty(url, params, response)
+            return convert_types(df) if typed else df
     else:
         raise RequestFailedException(
             f"Failed to retrieve data for {date}. Status code: {response.status_code}")
 
 
-def daily_stock_ratios(date, select_type, proxy=None, rate_limiter=default_rate_limiter):
+@coalesce
+def daily_stock_ratios(date, select_type, proxy=None, rate_limiter=default_rate_limiter, cache=None, session=None, typed=False):
     """
     Fetch daily stock ratios (e.g., PE ratio, dividend yield) from the TWSE.
     :reference: https://www.twse.com.tw/zh/trading/historical/bwibbu-day.html
     :param date: The date for which to fetch the data (format: YYYYMMDD).
     :param select_type: The type of data to select.
-    :param proxy: Optional proxy settings for the request.
+    :param proxy: Optional proxy settings for the request, or a ProxyPool.
+    :param rate_limiter: Rate limiter shared by the requests.
+    :param cache: Optional ResponseCache for the raw response.
+    :param session: Optional Session for the request.
+    :param typed: Convert the columns to numeric, datetime64 and categorical dtypes.
     :return type:  DataFrame.
     """
     url = f"{BASE_URL}/afterTrading/BWIBBU_d"
@@ -116,30 +153,32 @@ def daily_stock_ratios(date, select_type, proxy=None, rate_limiter=default_rate_
         'response': 'json'
     }
 
-    response = limited_request(url, headers=DEFAULT_HEADERS, params=params, proxy=proxy, rate_limiter=rate_limiter)
+    if is_known_empty(url, params):
+        return pd.DataFrame()
+
+    response = limited_request(url, headers=DEFAULT_HEADERS, params=params, proxy=proxy, rate_limiter=rate_limiter, cache=cache, session=session)
     if response.status_code == 200:
-        try:
-            data = response.json()
-        except json.JSONDecodeError:
-            raise JSONDecodeException("Failed to parse JSON response.", response.text)
-
-        if 'data' in data:
-            df = pd.DataFrame(data['data'], columns=data['fields'])
-            return df
-        else:
-            print(f"No data for {date} with type {select_type}.")
-            return pd.DataFrame()
+        with default_metrics.timer('parse_seconds', 'BWIBBU_d'):
+            df = parse_daily_stock_ratios(decode_json(response.content), date, select_type)
+            if df.empty:
+                record_empty(url, params, response)
+            return convert_types(df) if typed else df
     else:
         raise RequestFailedException(
             f"Failed to retrieve data for {date} with type {select_type}. Status code: {response.status_code}")
 
 
-def margin_trading(date, proxy=None, rate_limiter=default_rate_limiter):
+@coalesce
+def margin_trading(date, proxy=None, rate_limiter=default_rate_limiter, cache=None, session=None, typed=False):
     """
     Fetch margin trading information from the TWSE.
     :reference: https://www.twse.com.tw/zh/trading/margin/mi-margn.html
     :param date: The date for which to fetch the data (format: YYYYMMDD).
-    :param proxy: Optional proxy settings for the request.
+    :param proxy: Optional proxy settings for the request, or a ProxyPool.
+    :param rate_limiter: Rate limiter shared by the requests.
+    :param cache: Optional ResponseCache for the raw response.
+    :param session: Optional Session for the request.
+    :param typed: Convert the columns to numeric, datetime64 and categorical dtypes.
     :return type:  DataFrame.
     """
     url = f"{BASE_URL}/marginTrading/MI_MARGN"
@@ -149,30 +188,23 @@ def margin_trading(date, proxy=None, rate_limiter=default_rate_limiter):
         'response': 'json'
     }
 
-    response = limited_request(url, headers=DEFAULT_HEADERS, params=params, proxy=proxy, rate_limiter=rate_limiter)
+    if is_known_empty(url, params):
+        return pd.DataFrame()
+
+    response = limited_request(url, headers=DEFAULT_HEADERS, params=params, proxy=proxy, rate_limiter=rate_limiter, cache=cache, session=session)
     if response.status_code == 200:
-        try:
-            data = response.json()
-        except json.JSONDecodeError:
-            raise JSONDecodeException("Failed to parse JSON response.", response.text)
-
-        if 'tables' in data and len(data['tables']) > 1:
-            table = data['tables'][1]
-            fields = table['fields']
-            rows = table['data']
-            df = pd.DataFrame(rows, columns=fields)
-            df['Date'] = date
-            df.set_index('Date', inplace=True)
-            return df
-        else:
-            print(f"No data for {date}. Skipping.")
-            return pd.DataFrame()
+        with default_metrics.timer('parse_seconds', 'MI_MARGN'):
+            df = parse_margin_trading(decode_json(response.content), date)
+            if df.empty:
+                record_empty(url, params, response)
+            return convert_types(df) if typed else df
     else:
         raise RequestFailedException(
             f"Failed to retrieve data for {date} with type 'margin_trading'. Status code: {response.status_code}")
 
 
-def FIP_trading_data(date, select_type='ALL', proxy=None, rate_limiter=default_rate_limiter):
+@coalesce
+def FIP_trading_data(date, select_type='ALL', proxy=None, rate_limiter=default_rate_limiter, cache=None, session=None, typed=False):
     """
     F: Foreign Institutional Investors (FII)
     I: Investment Trusts (IT)
@@ -183,7 +215,11 @@ def FIP_trading_data(date, select_type='ALL', proxy=None, rate_limiter=default_r
     :param date: The date for which to fetch the data (format: YYYYMMDD).
     :param select_type: The type of data to select.
         :more information in README.md
-    :param proxy: Optional proxy settings for the request.
+    :param proxy: Optional proxy settings for the request, or a ProxyPool.
+    :param rate_limiter: Rate limiter shared by the requests.
+    :param cache: Optional ResponseCache for the raw response.
+    :param session: Optional Session for the request.
+    :param typed: Convert the columns to numeric, datetime64 and categorical dtypes.
     :return type: DataFrame.
     """
     url = f"{BASE_URL}/fund/T86"
@@ -193,19 +229,187 @@ def FIP_trading_data(date, select_type='ALL', proxy=None, rate_limiter=default_r
         'response': 'json'
     }
 
-    response = limited_request(url, headers=DEFAULT_HEADERS, params=params, proxy=proxy, rate_limiter=rate_limiter)
+    if is_known_empty(url, params):
+        return pd.DataFrame()
+
+    response = limited_request(url, headers=DEFAULT_HEADERS, params=params, proxy=proxy, rate_limiter=rate_limiter, cache=cache, session=session)
     if response.status_code == 200:
-        try:
-            data = response.json()
-        except json.JSONDecodeError:
-            raise JSONDecodeException("Failed to parse JSON response.", response.text)
-
-        if 'data' in data:
-            df = pd.DataFrame(data['data'], columns=data['fields'])
-            return df
-        else:
-            print(f"No data for {date} with type {select_type}.")
-            return pd.DataFrame()
+        with default_metrics.timer('parse_seconds', 'T86'):
+            df = parse_FIP_trading_data(decode_json(response.content), date, select_type)
+            if df.empty:
+                record_empty(url, params, response)
+            return convert_types(df) if typed else df
     else:
         raise RequestFailedException(
             f"Failed to retrieve data for {date} with type {select_type}. Status code: {response.status_code}")
+
+
+@coalesce
+def monthly_stock_prices(date, stock_no, proxy=None, rate_limiter=default_rate_limiter, cache=None, session=None, typed=False):
+    """
+    Fetch the daily prices of one stock for a whole month from the TWSE.
+    :reference: https://www.twse.com.tw/zh/trading/historical/stock-day.html
+
+    :param date: Any date of the month to fetch (format: YYYYMMDD).
+    :param stock_no: The ticker symbol, e.g. '2330'.
+    :param proxy: Optional proxy settings for the request, or a ProxyPool.
+    :param rate_limiter: Rate limiter shared by the requests.
+    :param cache: Optional ResponseCache for the raw response.
+    :param session: Optional Session for the request.
+    :param typed: Convert the columns to numeric, datetime64 and categorical dtypes.
+    :return type: DataFrame, one row per trading day with the ROC date in the first column.
+    """
+    url = f"{BASE_URL}/afterTrading/STOCK_DAY"
+    params = {
+        'date': date,
+        'stockNo': stock_no,
+        'response': 'json'
+    }
+
+    if is_known_empty(url, params):
+        return pd.DataFrame()
+
+    response = limited_request(url, headers=DEFAULT_HEADERS, params=params, proxy=proxy, rate_limiter=rate_limiter, cache=cache, session=session)
+    if response.status_code == 200:
+        with default_metrics.timer('parse_seconds', 'STOCK_DAY'):
+            df = parse_monthly_stock_data(decode_json(response.content), date, stock_no)
+            if df.empty:
+                record_empty(url, params, response)
+            return convert_types(df) if typed else df
+    else:
+        raise RequestFailedException(
+            f"Failed to retrieve data for {stock_no} in {date[:6]}. Status code: {response.status_code}")
+
+
+@coalesce
+def monthly_stock_ratios(date, stock_no, proxy=None, rate_limiter=default_rate_limiter, cache=None, session=None, typed=False):
+    """
+    Fetch the daily PE ratio, dividend yield and PB ratio of one stock for a whole month from the TWSE.
+    :reference: https://www.twse.com.tw/zh/trading/historical/bwibbu.html
+
+    :param date: Any date of the month to fetch (format: YYYYMMDD).
+    :param stock_no: The ticker symbol, e.g. '2330'.
+    :param proxy: Optional proxy settings for the request, or a ProxyPool.
+    :param rate_limiter: Rate limiter shared by the requests.
+    :param cache: Optional ResponseCache for the raw response.
+    :param session: Optional Session for the request.
+    :param typed: Convert the columns to numeric, datetime64 and categorical dtypes.
+    :return type: DataFrame, one row per trading day with the ROC date in the first column.
+    """
+    url = f"{BASE_URL}/afterTrading/BWIBBU"
+    params = {
+        'date': date,
+        'stockNo': stock_no,
+        'response': 'json'
+    }
+
+    if is_known_empty(url, params):
+        return pd.DataFrame()
+
+    response = limited_request(url, headers=DEFAULT_HEADERS, params=params, proxy=proxy, rate_limiter=rate_limiter, cache=cache, session=session)
+    if response.status_code == 200:
+        with default_metrics.timer('parse_seconds', 'BWIBBU'):
+            df = parse_monthly_stock_data(decode_json(response.content), date, stock_no)
+            if df.empty:
+                record_empty(url, params, response)
+            return convert_types(df) if typed else df
+    else:
+        raise RequestFailedException(
+            f"Failed to retrieve data for {stock_no} in {date[:6]}. Status code: {response.status_code}")
+
+
+def decode_json(content):
+    """
+    Decode the body of a TWSE JSON response, with orjson when it is installed.
+
+    :param content: The response body, as bytes or str.
+    :return: The decoded JSON object.
+    """
+    try:
+        if orjson is not None:
+            return orjson.loads(content)
+        return json.loads(content)
+    except ValueError:  # json.JSONDecodeError and orjson.JSONDecodeError both subclass ValueError
+        text = content.decode('utf-8', errors='replace') if isinstance(content, bytes) else content
+        raise JSONDecodeException("Failed to parse JSON response.", text)
+
+
+def parse_daily_closing_prices(data, table_index=8):
+    """
+    Build the daily_closing_prices DataFrame from a decoded MI_INDEX response.
+    """
+    if table_index < len(data.get('tables', [])):
+        table = data['tables'][table_index]
+        df = pd.DataFrame(table['data'], columns=table['fields'])
+        if len(df.columns) > 9:
+            df.isetitem(9, remove_html_tags_series(df.iloc[:, 9]))
+        return df
+    else:
+        print(f"Table index {table_index} is out of range.")
+        return pd.DataFrame()
+
+
+def parse_market_trading_info(data, date):
+    """
+    Build the market_trading_info DataFrame from a decoded FMTQIK response.
+    """
+    if 'data' in data:
+        df = pd.DataFrame(data['data'], columns=data['fields'])
+        return df
+    else:
+        print(f"No data found for {date}.")
+        return pd.DataFrame()
+
+
+def parse_daily_stock_ratios(data, date, select_type):
+    """
+    Build the daily_stock_ratios DataFrame from a decoded BWIBBU_d response.
+    """
+    if 'data' in data:
+        df = pd.DataFrame(data['data'], columns=data['fields'])
+        return df
+    else:
+        print(f"No data for {date} with type {select_type}.")
+        return pd.DataFrame()
+
+
+def parse_margin_trading(data, date):
+    """
+    Build the margin_trading DataFrame from a decoded MI_MARGN response.
+    """
+    if 'tables' in data and len(data['tables']) > 1:
+        table = data['tables'][1]
+        fields = table['fields']
+        rows = table['data']
+        df = pd.DataFrame(rows, columns=fields)
+        df['Date'] = date
+        df.set_index('Date', inplace=True)
+        return df
+    else:
+        print(f"No data for {date}. Skipping.")
+        return pd.DataFrame()
+
+
+def parse_FIP_trading_data(data, date, select_type):
+    """
+    Build the FIP_trading_data DataFrame from a decoded T86 response.
+    """
+    if 'data' in data:
+        df = pd.DataFrame(data['data'], columns=data['fields'])
+        return df
+    else:
+        print(f"No data for {date} with type {select_type}.")
+        return pd.DataFrame()
+
+
+def parse_monthly_stock_data(data, date, stock_no):
+    """
+    Build the monthly_stock_prices / monthly_stock_ratios DataFrame from a decoded
+    STOCK_DAY or BWIBBU response.
+    """
+    if 'data' in data:
+        df = pd.DataFrame(data['data'], columns=data['fields'])
+        return df
+    else:
+        print(f"No data for {stock_no} in {date[:6]}.")
+        return pd.DataFrame()
@@ -0,0 +1,142 @@
+# Copyright 2024 JayC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Your Python code starts here
+
+
+import numpy as np
+import pandas as pd
+
+# Cell values TWSE uses for "no value".
+PLACEHOLDERS = ['-', '--', '---', '----', 'X', '']
+PLACEHOLDER_SET = frozenset(PLACEHOLDERS)
+
+# Security code and name columns, stored as categoricals.
+CATEGORICAL_COLUMNS = ['證券代號', '證券名稱', '代號', '名稱', '股票代號', '股票名稱', 'Ticker']
+
+ROC_DATE_PATTERN = r'^\d{2,3}/\d{1,2}/\d{1,2}$'
+# Year, month and day of an ROC date, e.g. "113/07/01" or "113年07月01日".
+ROC_DATE_PARTS = r'^\s*(\d{2,3})\D+(\d{1,2})\D+(\d{1,2})'
+
+
+def convert_types(df, categorical_columns=CATEGORICAL_COLUMNS):
+    """
+    Convert the string columns of a TWSE DataFrame to compact dtypes.
+
+    Thousands-separated numbers become int64 (float64 if a placeholder is present),
+    placeholders become NaN, ROC dates become datetime64 and code/name columns become
+    categoricals. Columns that do not parse cleanly are left untouched.
+
+    :param df: DataFrame returned by one of the core functions or Ticker.
+    :param categorical_columns: Column names to store as categoricals.
+    :return type: DataFrame.
+    """
+    df = df.copy()
+    for i, column in enumerate(df.columns):
+        series = df.iloc[:, i]
+        if column in categorical_columns:
+            df.isetitem(i, to_categorical(series))
+        else:
+            df.isetitem(i, convert_series(series))
+
+    if df.index.name == 'Date' and _is_text(df.index.dtype):
+        df.index = pd.to_datetime(df.index, format='%Y%m%d', errors='coerce')
+    return df
+
+
+def convert_series(series):
+    """
+    Convert one string column to a numeric or datetime64 Series.
+
+    Numbers are parsed in a single pass over the column into a float64 array, which
+    measures faster than chained pandas string methods (see benchmarks/bench_typed.py).
+
+    :param series: Series of strings.
+    :return type: Series.
+    """
+    if not _is_text(series.dtype):
+        return series
+
+    values = series.to_numpy(dtype=object)
+    try:
+        numbers = np.array([float(value.replace(',', '')) if value not in PLACEHOLDER_SET else np.nan
+                            for value in values], dtype='float64')
+    except ValueError:
+        # A string that is not a number, e.g. names, signs or ROC dates.
+        return _convert_non_numeric(series)
+    except (AttributeError, TypeError):
+        # Cells that are not strings, e.g. NaN for missing tickers in Ticker.data.
+        return _convert_mixed(series)
+
+    if np.isnan(numbers).all():
+        return series
+    # Prices such as "1,415.00" stay float64 even when every value is whole, so the
+    # dtype of a column does not change from one day to the next.
+    if not np.isnan(numbers).any() and (numbers % 1 == 0).all() and not any('.' in value for value in values):
+        return pd.Series(numbers.astype('int64'), index=series.index, name=series.name)
+    return pd.Series(numbers, index=series.index, name=series.name)
+
+
+def _convert_non_numeric(series):
+    values = series.mask(series.isin(PLACEHOLDERS)).dropna()
+    if len(values) and values.str.match(ROC_DATE_PATTERN).all():
+        return roc_to_datetime(series.mask(series.isin(PLACEHOLDERS)))
+    return series
+
+
+def _convert_mixed(series):
+    is_text = series.map(lambda value: isinstance(value, str), na_action='ignore').fillna(False).astype(bool)
+    if not is_text.any():
+        return series.infer_objects()
+    if not (is_text | series.isna()).all():
+        return series
+
+    converted = convert_series(series[is_text].astype(object))
+    if converted.dtype == 'int64':
+        converted = converted.astype('float64')
+    return converted.reindex(series.index)
+
+
+def to_categorical(series):
+    """
+    Convert a column to a categorical, keeping the categories in order of appearance.
+
+    pd.factorize is several times faster than astype('category') on string columns.
+    """
+    codes, categories = pd.factorize(series)
+    return pd.Series(pd.Categorical.from_codes(codes, categories=categories), index=series.index, name=series.name)
+
+
+def roc_to_datetime(series, errors='raise'):
+    """
+    Convert ROC calendar dates such as "113/07/01" or "113年07月01日" to datetime64.
+
+    :param series: Series of ROC date strings, NaN for missing values.
+    :param errors: 'coerce' turns values that are not dates, e.g. notes or total rows, into NaT.
+    :return type: Series of datetime64.
+    """
+    if errors == 'coerce':
+        parts = series.str.extract(ROC_DATE_PARTS)
+    else:  # Columns convert_series matched against ROC_DATE_PATTERN; splitting is about twice as fast
+        parts = series.str.split('/', expand=True)
+    return pd.to_datetime(pd.DataFrame({
+        'year': pd.to_numeric(parts[0], errors=errors) + 1911,
+        'month': pd.to_numeric(parts[1], errors=errors),
+        'day': pd.to_numeric(parts[2], errors=errors),
+    }), errors='coerce')
+
+
+def _is_text(dtype):
+    # object on pandas < 3, the dedicated string dtype on pandas >= 3
+    return dtype == object or isinstance(dtype, pd.StringDtype)
@@ -0,0 +1,196 @@
+# Copyright 2024 JayC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Your Python code starts here
+
+
+import time
+import bisect
+import threading
+from contextlib import contextmanager
+
+SECONDS_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+BYTES_BUCKETS = (1_000, 10_000, 50_000, 100_000, 500_000, 1_000_000, 5_000_000, 10_000_000)
+
+# Histogram metrics and their buckets; every other metric is a counter.
+HISTOGRAMS = {
+    'request_seconds': SECONDS_BUCKETS,
+    'response_bytes': BYTES_BUCKETS,
+    'rate_limit_wait_seconds': SECONDS_BUCKETS,
+    'parse_seconds': SECONDS_BUCKETS,
+}
+
+
+class Histogram:
+    """
+    Cumulative-bucket histogram, as in Prometheus.
+    """
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # the last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+        self.max = max(self.max, value)
+
+    def quantile(self, q):
+        """
+        Return the upper bound of the bucket holding quantile q, capped at the largest value seen.
+        """
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+
+class MetricsRegistry:
+    """
+    Per-endpoint request metrics.
+
+    limited_request and the core functions record request latency, response size,
+    retries, rate-limiter wait, parse time and cache hits/misses here. Hooks added
+    with add_hook receive every event as it is recorded, e.g. to forward it to
+    another monitoring system.
+    """
+
+    def __init__(self, enabled=True):
+        """
+        Initialize MetricsRegistry instance.
+
+        :param enabled: Record metrics. When disabled, nothing is recorded and hooks are not called.
+        """
+        self.enabled = enabled
+        self.lock = threading.Lock()
+        self.histograms = {}
+        self.counters = {}
+        self.hooks = []
+
+    def add_hook(self, hook):
+        """
+        Register a callable called as hook(name, endpoint, value) for every recorded event.
+        """
+        self.hooks.append(hook)
+
+    def remove_hook(self, hook):
+        self.hooks.remove(hook)
+
+    def record(self, name, endpoint, value=1):
+        """
+        Record one event: an observation for histogram metrics, an increment for counters.
+
+        :param name: Metric name, e.g. 'request_seconds' or 'retries_total'.
+        :param endpoint: Endpoint label, e.g. 'MI_INDEX'.
+        :param value: Observed value or increment.
+        """
+        if not self.enabled:
+            return
+
+        key = (name, endpoint)
+        with self.lock:
+            if name in HISTOGRAMS:
+                histogram = self.histograms.get(key)
+                if histogram is None:
+                    histogram = self.histograms[key] = Histogram(HISTOGRAMS[name])
+                histogram.observe(value)
+            else:
+                self.counters[key] = self.counters.get(key, 0) + value
+        for hook in self.hooks:
+            hook(name, endpoint, value)
+
+    @contextmanager
+    def timer(self, name, endpoint):
+        """
+        Record the time spent in the with-block as `name`.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, endpoint, time.perf_counter() - start)
+
+    def reset(self):
+        with self.lock:
+            self.histograms.clear()
+            self.counters.clear()
+
+    def summary(self):
+        """
+        Return the metrics as a dictionary keyed by endpoint.
+        """
+        result = {}
+        with self.lock:
+            for (name, endpoint), histogram in self.histograms.items():
+                result.setdefault(endpoint, {})[name] = {
+                    'count': histogram.count,
+                    'sum': histogram.sum,
+                    'mean': histogram.sum / histogram.count if histogram.count else 0.0,
+                    'p50': histogram.quantile(0.5),
+                    'p95': histogram.quantile(0.95),
+                    'max': histogram.max,
+                }
+            for (name, endpoint), value in self.counters.items():
+                result.setdefault(endpoint, {})[name] = value
+
+        for metrics in result.values():
+            hits = metrics.get('cache_hits_total', 0)
+            misses = metrics.get('cache_misses_total', 0)
+            if hits + misses:
+                metrics['cache_hit_ratio'] = hits / (hits + misses)
+        return result
+
+    def to_prometheus(self, prefix='twsepy'):
+        """
+        Return the metrics in the Prometheus text exposition format.
+        """
+        lines = []
+        with self.lock:
+            for name in sorted({name for name, _ in self.histograms}):
+                lines.append(f"# TYPE {prefix}_{name} histogram")
+                for (metric, endpoint), histogram in sorted(self.histograms.items()):
+                    if metric != name:
+                        continue
+                    cumulative = 0
+                    for bound, count in zip(histogram.buckets + ('+Inf',), histogram.counts):
+                        cumulative += count
+                        lines.append(f'{prefix}_{name}_bucket{{endpoint="{endpoint}",le="{bound}"}} {cumulative}')
+                    lines.append(f'{prefix}_{name}_sum{{endpoint="{endpoint}"}} {histogram.sum}')
+                    lines.append(f'{prefix}_{name}_count{{endpoint="{endpoint}"}} {histogram.count}')
+            for name in sorted({name for name, _ in self.counters}):
+                lines.append(f"# TYPE {prefix}_{name} counter")
+                for (metric, endpoint), value in sorted(self.counters.items()):
+                    if metric == name:
+                        lines.append(f'{prefix}_{name}{{endpoint="{endpoint}"}} {value}')
+        return '\n'.join(lines) + '\n'
+
+
+def endpoint_name(url):
+    """
+    Return the endpoint label of a URL, e.g. 'MI_INDEX'.
+    """
+    return url.rstrip('/').rsplit('/', 1)[-1]
+
+
+# Global default registry used by limited_request and the core functions.
+default_metrics = MetricsRegistry()
@@ -0,0 +1,185 @@
+# Copyright 2024 JayC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Your Python code starts here
+
+
+import os
+import json
+import threading
+from . import cache as response_cache
+from .cache import is_closed
+from .config import BASE_URL
+from .metrics import endpoint_name
+
+# MI_INDEX answers every trading day, whatever the type, so a date it has no table
+# for is a day the market was closed.
+MARKET_ENDPOINT = 'MI_INDEX'
+
+# URL of each endpoint the core functions record, to find the cached responses of an entry.
+ENDPOINT_URLS = {
+    'MI_INDEX': f"{BASE_URL}/afterTrading/MI_INDEX",
+    'FMTQIK': f"{BASE_URL}/afterTrading/FMTQIK",
+    'BWIBBU_d': f"{BASE_URL}/afterTrading/BWIBBU_d",
+    'MI_MARGN': f"{BASE_URL}/marginTrading/MI_MARGN",
+    'T86': f"{BASE_URL}/fund/T86",
+    'STOCK_DAY': f"{BASE_URL}/afterTrading/STOCK_DAY",
+    'BWIBBU': f"{BASE_URL}/afterTrading/BWIBBU",
+}
+
+# Per-stock endpoints, whose index key holds the stock number in place of the type.
+PER_STOCK_ENDPOINTS = ('STOCK_DAY', 'BWIBBU')
+
+
+class NoDataIndex:
+    """
+    Persistent index of requests TWSE confirmed have no data.
+
+    Entries are keyed by (endpoint, date, type/selectType), like ResponseCache. The core
+    functions skip recorded requests without sending them, and dates MI_INDEX has no data
+    for are removed from CalendarManager.get_trading_dates. Only dates before the current
+    session are recorded, since today's tables may simply not be published yet.
+    """
+
+    def __init__(self, path=None):
+        """
+        Initialize NoDataIndex instance.
+
+        :param path: JSON file holding the index. Defaults to ~/.cache/twsepy/no_data.json.
+        """
+        self.path = os.path.expanduser(path or os.path.join('~', '.cache', 'twsepy', 'no_data.json'))
+        self.lock = threading.Lock()
+        self.entries = self._load()
+
+    def key(self, url, params):
+        """
+        Build the index key of a request: (endpoint, date, type/selectType). Per-stock
+        endpoints use the stock number in place of the type.
+        """
+        params = params or {}
+        select_type = params.get('type', params.get('selectType', params.get('stockNo', '')))
+        return endpoint_name(url), str(params.get('date', '')), select_type
+
+    def contains(self, url, params):
+        """
+        Check whether a request is known to have no data.
+        """
+        return self.key(url, params) in self.entries
+
+    def add(self, url, params):
+        """
+        Record that a request has no data. Requests for the current session are ignored.
+        """
+        if not is_closed(url, params):
+            return
+        key = self.key(url, params)
+        with self.lock:
+            if key not in self.entries:
+                self.entries.add(key)
+                self._save()
+
+    def closed_dates(self):
+        """
+        Return the dates (YYYYMMDD) the market is known to have been closed on.
+        """
+        with self.lock:  # add() updates the set in place from the fetch threads
+            return sorted({date for endpoint, date, _ in self.entries if endpoint == MARKET_ENDPOINT})
+
+    def invalidate(self, endpoint=None, start_date=None, end_date=None, cache=None):
+        """
+        Remove entries so their requests are sent again. Without arguments the whole index is cleared.
+
+        The cached responses of the removed entries are evicted as well, otherwise the next
+        request would be served the same empty payload and recorded again.
+
+        :param endpoint: Optional endpoint name, e.g. 'T86'.
+        :param start_date: Optional start date (format: YYYYMMDD).
+        :param end_date: Optional end date (format: YYYYMMDD).
+        :param cache: ResponseCache to evict the responses from. Defaults to
+            twsepy.cache.default_cache; False leaves every cache untouched.
+        :return: Number of entries removed.
+        """
+        with self.lock:
+            removed = {
+                key for key in self.entries
+                if (endpoint is None or key[0] == endpoint)
+                and (start_date is None or key[1] >= str(start_date))
+                and (end_date is None or key[1] <= str(end_date))
+            }
+            self.entries -= removed
+            self._save(merge=False)
+
+        if cache is None:
+            cache = response_cache.default_cache
+        if cache:
+            for key in removed:
+                request = self.request(key)
+                if request is not None:
+                    cache.delete(*request)
+        return len(removed)
+
+    def request(self, key):
+        """
+        Return the (url, params) of an index key, as the core functions send it, or None
+        for an unknown endpoint.
+        """
+        endpoint, date, select_type = key
+        if endpoint not in ENDPOINT_URLS:
+            return None
+        name = 'stockNo' if endpoint in PER_STOCK_ENDPOINTS else 'type'  # The cache key treats type and selectType alike
+        return ENDPOINT_URLS[endpoint], {'date': date, name: select_type}
+
+    def clear(self):
+        return self.invalidate()
+
+    def _load(self):
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                return {tuple(entry) for entry in json.load(f)}
+        except (OSError, ValueError):
+            return set()
+
+    def _save(self, merge=True):
+        if merge:
+            # Keep what other processes recorded since this index was loaded.
+            self.entries |= self._load()
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(sorted(self.entries), f)
+        os.replace(tmp_path, self.path)
+
+
+# Global default index, disabled until set_default_no_data_index is called.
+default_index = None
+
+
+def set_default_no_data_index(index):
+    """
+    Set the index used by the core functions and CalendarManager.
+
+    :param index: A NoDataIndex instance, or None to disable it.
+    """
+    global default_index
+    default_index = index
+
+
+def is_known_empty(url, params):
+    return default_index is not None and default_index.contains(url, params)
+
+
+def record_empty(url, params, response=None):
+    # A cached response written before the date closed may predate the publication.
+    if default_index is not None and getattr(response, 'final', True):
+        default_index.add(url, params)
@@ -0,0 +1,218 @@
+# Copyright 2024 JayC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Your Python code starts here
+
+
+import os
+import threading
+import pandas as pd
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from .cache import TAIPEI
+from .utils import default_rate_limiter, simple_progress_bar
+from .calendar_manager import get_calendar_manager
+from .ticker import DATASET_COLUMNS, fetch_dataset
+
+FORMATS = {'parquet': '.parquet', 'feather': '.feather'}
+
+
+class LocalStore:
+    """
+    Local columnar store of full-market TWSE tables.
+
+    Every (dataset, date) table is one file, laid out as
+    `root/<dataset>/date=YYYYMMDD.parquet`, so syncing writes only the new days and
+    reads only open the partitions in the requested date range. Parquet reads also
+    push the ticker filter and column projection down to the file.
+    """
+
+    def __init__(self, root, format='parquet', rate_limiter=default_rate_limiter, cache=None, session=None):
+        """
+        Initialize LocalStore instance.
+
+        :param root: Root directory of the store.
+        :param format: 'parquet' or 'feather'. Both need pyarrow.
+        :param rate_limiter: Rate limiter shared by the requests made by sync().
+        :param cache: Optional ResponseCache for the raw responses.
+        :param session: Optional Session for the requests.
+        """
+        if format not in FORMATS:
+            raise ValueError(f"Unknown format: {format}")
+        self.root = os.path.expanduser(root)
+        self.format = format
+        self.rate_limiter = rate_limiter
+        self.cache = cache
+        self.session = session
+
+    def dates(self, dataset):
+        """
+        Return the sorted dates (YYYYMMDD) stored for a dataset.
+        """
+        directory = os.path.join(self.root, dataset)
+        if not os.path.isdir(directory):
+            return []
+        suffix = FORMATS[self.format]
+        return sorted(name[5:-len(suffix)] for name in os.listdir(directory)
+                      if name.startswith('date=') and name.endswith(suffix))
+
+    def missing_dates(self, dataset, start_date, end_date):
+        """
+        Return the trading dates between start_date and end_date not yet stored for a dataset.
+        """
+        stored = set(self.dates(dataset))
+        trading_days = get_calendar_manager().get_trading_dates(start_date, end_date)
+        return [date.strftime('%Y%m%d') for date in trading_days if date.strftime('%Y%m%d') not in stored]
+
+    def sync(self, start_date, end_date, datasets=tuple(DATASET_COLUMNS), select_type='ALLBUT0999', max_workers=1):
+        """
+        Fetch and store the trading days missing between start_date and end_date.
+
+        Days from the current session that return no data are not stored, so the next
+        sync tries them again once TWSE has published them.
+
+        :param start_date: Start date (format: YYYYMMDD).
+        :param end_date: End date (format: YYYYMMDD).
+        :param datasets: Datasets to sync, any of 'prices', 'margin', 'ratios', 'institutional'.
+        :param select_type: The type passed to FIP_trading_data.
+        :param max_workers: Number of threads fetching tables concurrently.
+        :return: Dictionary of dataset -> list of dates written.
+        """
+        tasks = [(dataset, date_str) for dataset in datasets for date_str in self.missing_dates(dataset, start_date, end_date)]
+        written = {dataset: [] for dataset in datasets}
+        if not tasks:
+            return written
+
+        today = datetime.now(TAIPEI).strftime('%Y%m%d')
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(fetch_dataset, dataset, date_str, select_type, self.rate_limiter, self.cache, self.session): (dataset, date_str)
+                for dataset, date_str in tasks
+            }
+            try:
+                for i, future in enumerate(as_completed(futures), 1):
+                    dataset, date_str = futures[future]
+                    df = future.result()
+                    if not df.empty or date_str < today:
+                        self.write(dataset, date_str, df)
+                        written[dataset].append(date_str)
+                    simple_progress_bar(i, len(tasks), 'sync')
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                raise
+
+        for dates in written.values():
+            dates.sort()
+        return written
+
+    def write(self, dataset, date_str, df):
+        """
+        Store the full-market table of one dataset and date, replacing any previous one.
+        Repeated column names are made unique and the code column is stripped.
+        """
+        directory = os.path.join(self.root, dataset)
+        os.makedirs(directory, exist_ok=True)
+        path = self._path(dataset, date_str)
+
+        df = df.reset_index(drop=True)  # margin_trading's Date index is the partition date
+        df.columns = unique_columns(df.columns)
+        if len(df.columns):
+            # T86 pads some codes with spaces; strip them so ticker filters match.
+            df.isetitem(0, df.iloc[:, 0].astype(str).str.strip())
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        if self.format == 'parquet':
+            df.to_parquet(tmp_path, index=False)
+        else:
+            df.to_feather(tmp_path)
+        os.replace(tmp_path, path)
+
+    def read(self, dataset, start_date=None, end_date=None, tickers=None, columns=None):
+        """
+        Read a dataset from the store.
+
+        Only the partitions between start_date and end_date are opened.
+
+        :param dataset: One of 'prices', 'margin', 'ratios', 'institutional'.
+        :param start_date: Optional start date (format: YYYYMMDD).
+        :param end_date: Optional end date (format: YYYYMMDD).
+        :param tickers: Optional list of ticker symbols to keep.
+        :param columns: Optional list of columns to load. The code column is always loaded.
+        :return type: DataFrame with a Date column followed by the table columns.
+        """
+        start = pd.Timestamp(start_date).strftime('%Y%m%d') if start_date is not None else ''
+        end = pd.Timestamp(end_date).strftime('%Y%m%d') if end_date is not None else '99999999'
+
+        frames = []
+        for date_str in self.dates(dataset):
+            if start <= date_str <= end:
+                df = self._read_partition(dataset, date_str, tickers, columns)
+                if not df.empty:
+                    df.insert(0, 'Date', pd.Timestamp(date_str))
+                    frames.append(df)
+
+        if not frames:
+            return pd.DataFrame(columns=['Date'] + list(columns or []))
+        return pd.concat(frames, ignore_index=True)
+
+    def _read_partition(self, dataset, date_str, tickers, columns):
+        path = self._path(dataset, date_str)
+        if self.format == 'parquet':
+            import pyarrow.parquet as pq
+            fields = pq.read_schema(path).names
+        else:
+            import pyarrow.feather as feather
+            fields = feather.read_table(path, memory_map=True).column_names
+        if not fields:
+            return pd.DataFrame()
+
+        code_column = fields[0]
+        if columns is not None:
+            columns = [code_column] + [column for column in columns if column != code_column and column in fields]
+
+        if self.format == 'parquet':
+            filters = [(code_column, 'in', list(tickers))] if tickers is not None else None
+            return pd.read_parquet(path, columns=columns, filters=filters)
+
+        df = pd.read_feather(path, columns=columns)
+        if tickers is not None:
+            df = df[df[code_column].isin(tickers)].reset_index(drop=True)
+        return df
+
+    def _path(self, dataset, date_str):
+        return os.path.join(self.root, dataset, f"date={date_str}{FORMATS[self.format]}")
+
+
+def unique_columns(columns):
+    """
+    Make column names unique by suffixing repeats, e.g. the two '買進' columns of MI_MARGN
+    become '買進' and '買進_1'.
+    """
+    seen = {}
+    result = []
+    for column in columns:
+        column = str(column)
+        if column in seen:
+            seen[column] += 1
+            result.append(f"{column}_{seen[column]}")
+        else:
+            seen[column] = 0
+            result.append(column)
+    return result
+
+# Usage example:
+# store = LocalStore('~/twse-data')
+# store.sync('20240101', '20240630')          # first run fetches everything
+# store.sync('20240101', '20240701')          # later runs fetch only the new day
+# store.read('prices', '20240601', '20240630', tickers=['2330'], columns=['收盤價'])
@@ -16,133 +16,567 @@
 
 
 import pandas as pd
-from twsepy.core import daily_closing_prices, margin_trading, daily_stock_ratios, FIP_trading_data
-from twsepy.calendar_manager import CalendarManager
-from twsepy.utils import RateLimiter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from twsepy.core import (daily_closing_prices, margin_trading, daily_stock_ratios, FIP_trading_data, monthly_stock_prices,
+                         monthly_stock_ratios)
+from twsepy.calendar_manager import get_calendar_manager
+from twsepy.utils import default_rate_limiter
 from twsepy.utils import simple_progress_bar
+from twsepy.dtypes import convert_types, roc_to_datetime
+from twsepy.analytics import RollingAnalytics
+
+DATA_COLUMNS = [
+    'Date', 'Open', 'High', 'Low', 'Close', 'Volume', 'Transaction Value',
+    'Margin Buy', 'Margin Sell', 'Margin Cash Repay', 'Margin Previous Balance', 'Margin Current Balance', 'Margin Next Limit',
+    'Short Buy', 'Short Sell', 'Short Repay', 'Short Previous Balance', 'Short Current Balance', 'Short Next Limit', 'Offset',
+    'Dividend Yield', 'PE Ratio', 'PB Ratio',
+    'FII Buy', 'FII Sell', 'FII Net Buy/Sell', 'Proprietary Buy', 'Proprietary Sell', 'Proprietary Net Buy/Sell',
+    'IT Buy', 'IT Sell', 'IT Net Buy/Sell', 'PT Net Buy/Sell', 'PT Buy (Self-trading)', 'PT Sell (Self-trading)',
+    'PT Net Buy/Sell (Self-trading)', 'PT Buy (Hedging)', 'PT Sell (Hedging)', 'PT Net Buy/Sell (Hedging)', 'Three Institutional Investors Net Buy/Sell'
+]
+
+# Output column -> positional column in the full-market table of each dataset.
+PRICE_COLUMNS = {
+    'Open': 5, 'High': 6, 'Low': 7, 'Close': 8, 'Volume': 2, 'Transaction Value': 4
+}
+MARGIN_COLUMNS = {
+    'Margin Buy': 2, 'Margin Sell': 3, 'Margin Cash Repay': 4, 'Margin Previous Balance': 5,
+    'Margin Current Balance': 6, 'Margin Next Limit': 7,
+    'Short Buy': 8, 'Short Sell': 9, 'Short Repay': 10, 'Short Previous Balance': 11,
+    'Short Current Balance': 12, 'Short Next Limit': 13, 'Offset': 14
+}
+RATIO_COLUMNS = {
+    'Dividend Yield': 2, 'PE Ratio': 4, 'PB Ratio': 5
+}
+FIP_COLUMNS = {
+    'FII Buy': 2, 'FII Sell': 3, 'FII Net Buy/Sell': 4,
+    'Proprietary Buy': 5, 'Proprietary Sell': 6, 'Proprietary Net Buy/Sell': 7,
+    'IT Buy': 8, 'IT Sell': 9, 'IT Net Buy/Sell': 10,
+    'PT Net Buy/Sell': 11, 'PT Buy (Self-trading)': 12, 'PT Sell (Self-trading)': 13,
+    'PT Net Buy/Sell (Self-trading)': 14, 'PT Buy (Hedging)': 15, 'PT Sell (Hedging)': 16,
+    'PT Net Buy/Sell (Hedging)': 17, 'Three Institutional Investors Net Buy/Sell': 18
+}
+
+DATASET_COLUMNS = {
+    'prices': PRICE_COLUMNS,
+    'margin': MARGIN_COLUMNS,
+    'ratios': RATIO_COLUMNS,
+    'institutional': FIP_COLUMNS,
+}
+
+# Output column -> positional column in the per-stock monthly tables (STOCK_DAY, BWIBBU).
+MONTHLY_PRICE_COLUMNS = {
+    'Open': 3, 'High': 4, 'Low': 5, 'Close': 6, 'Volume': 1, 'Transaction Value': 2
+}
+MONTHLY_RATIO_COLUMNS = {
+    'Dividend Yield': 1, 'PE Ratio': 3, 'PB Ratio': 4
+}
+
+MONTHLY_DATASET_COLUMNS = {
+    'prices': MONTHLY_PRICE_COLUMNS,
+    'ratios': MONTHLY_RATIO_COLUMNS,
+}
+
+# Typical response size in bytes of the endpoint behind each dataset, daily full-market
+# and per-stock monthly, used by plan_requests.
+DAILY_RESPONSE_BYTES = {'prices': 1_000_000, 'margin': 200_000, 'ratios': 100_000, 'institutional': 350_000}
+MONTHLY_RESPONSE_BYTES = {'prices': 2_000, 'ratios': 2_000}
+
+# Cost of one request in bytes: a rate-limited request slot is worth about 2 MB of transfer.
+REQUEST_COST = 2_000_000
+
+
+def fetch_dataset(dataset, date_str, select_type='ALLBUT0999', rate_limiter=default_rate_limiter, cache=None, session=None,
+                  proxy=None):
+    """
+    Fetch the full-market table behind one of the Ticker datasets.
+
+    :param dataset: One of 'prices', 'margin', 'ratios' or 'institutional'.
+    :param date_str: The date for which to fetch the data (format: YYYYMMDD).
+    :param select_type: The type passed to FIP_trading_data.
+    :param rate_limiter: Rate limiter shared by the requests.
+    :param cache: Optional ResponseCache for the raw responses.
+    :param session: Optional Session for the requests.
+    :param proxy: Optional proxy settings or ProxyPool for the requests.
+    :return type: DataFrame.
+    """
+    if dataset == 'prices':
+        return daily_closing_prices(date_str, 'ALL', 8, proxy, rate_limiter=rate_limiter, cache=cache, session=session)
+    if dataset == 'margin':
+        return margin_trading(date_str, proxy, rate_limiter=rate_limiter, cache=cache, session=session)
+    if dataset == 'ratios':
+        return daily_stock_ratios(date_str, 'ALL', proxy, rate_limiter=rate_limiter, cache=cache, session=session)
+    if dataset == 'institutional':
+        return FIP_trading_data(date_str, select_type, proxy, rate_limiter=rate_limiter, cache=cache, session=session)
+    raise ValueError(f"Unknown dataset: {dataset}")
+
+
+def fetch_monthly_dataset(dataset, ticker, month, rate_limiter=default_rate_limiter, cache=None, session=None, proxy=None):
+    """
+    Fetch one month of one ticker from the per-stock endpoint behind a Ticker dataset.
+
+    :param dataset: 'prices' (STOCK_DAY) or 'ratios' (BWIBBU).
+    :param ticker: The ticker symbol.
+    :param month: The month to fetch (format: YYYYMM).
+    :return type: DataFrame.
+    """
+    if dataset == 'prices':
+        return monthly_stock_prices(f"{month}01", ticker, proxy, rate_limiter=rate_limiter, cache=cache, session=session)
+    if dataset == 'ratios':
+        return monthly_stock_ratios(f"{month}01", ticker, proxy, rate_limiter=rate_limiter, cache=cache, session=session)
+    raise ValueError(f"No per-stock endpoint for dataset: {dataset}")
+
+
+def plan_requests(n_tickers, date_strs, datasets):
+    """
+    Choose, for each dataset, between full-market daily tables and per-stock monthly tables.
+
+    Daily tables cost one request per date whatever the number of tickers; monthly tables
+    cost one request per ticker and month but are several hundred times smaller. Each
+    plan is costed as requests * REQUEST_COST + bytes and the cheaper one is kept.
+    Margin and institutional data have no per-stock endpoint and are always daily.
+
+    :param n_tickers: Number of tickers requested, or None for the whole market.
+    :param date_strs: Dates to fetch (format: YYYYMMDD).
+    :param datasets: Datasets to fetch.
+    :return: Dictionary of dataset -> 'daily' or 'monthly'.
+    """
+    n_months = len({date_str[:6] for date_str in date_strs})
+    plan = {}
+    for dataset in datasets:
+        plan[dataset] = 'daily'
+        if n_tickers is not None and dataset in MONTHLY_DATASET_COLUMNS:
+            daily = len(date_strs) * (REQUEST_COST + DAILY_RESPONSE_BYTES[dataset])
+            monthly = n_tickers * n_months * (REQUEST_COST + MONTHLY_RESPONSE_BYTES[dataset])
+            if monthly < daily:
+                plan[dataset] = 'monthly'
+    return plan
+
+
+def extract_tickers(df, tickers, column_map):
+    """
+    Pick the rows of ``tickers`` out of a full-market table.
+
+    The first column of every TWSE table holds the security code, so the table is
+    indexed by it once and all requested tickers are selected in a single lookup.
+
+    :param df: Full-market DataFrame returned by one of the core functions.
+    :param tickers: List of ticker symbols to keep, or None to keep the whole market.
+    :param column_map: Output column -> positional column in ``df``.
+    :return type: DataFrame indexed by ticker, one row per requested ticker found.
+    """
+    columns = list(column_map)
+    if df is None or df.empty:
+        return pd.DataFrame(columns=columns, index=pd.Index([], name='Ticker'))
+
+    selected = df.iloc[:, list(column_map.values())]
+    selected.columns = columns
+    selected.index = pd.Index(df.iloc[:, 0].astype(str).str.strip(), name='Ticker')
+    if tickers is not None:
+        selected = selected[selected.index.isin(tickers)]
+    return selected[~selected.index.duplicated()]
+
+
+def extract_month(df, column_map):
+    """
+    Index a per-stock monthly table by date (YYYYMMDD) and keep the columns of ``column_map``.
+
+    :param df: DataFrame returned by monthly_stock_prices or monthly_stock_ratios.
+    :param column_map: Output column -> positional column in ``df``.
+    :return type: DataFrame indexed by date string.
+    """
+    columns = list(column_map)
+    if df is None or df.empty:
+        return pd.DataFrame(columns=columns)
+
+    dates = roc_to_datetime(df.iloc[:, 0].astype(str), errors='coerce')
+    parsed = dates.notna().to_numpy()  # Rows whose first cell is not a date, e.g. notes, are dropped
+    selected = df.iloc[parsed, list(column_map.values())]
+    selected.columns = columns
+    selected.index = dates[parsed].dt.strftime('%Y%m%d').to_numpy()
+    return selected[~selected.index.duplicated()]
+
+
+def download_tickers(tickers, trading_days, select_type='ALLBUT0999', rate_limiter=default_rate_limiter, cache=None,
+                     session=None, max_workers=1, progress_name=None, datasets=tuple(DATASET_COLUMNS), columns=None,
+                     plan=None, proxy=None):
+    """
+    Download every dataset for ``tickers`` over ``trading_days``.
+
+    plan_requests picks the cheaper source of each dataset: full-market daily tables,
+    fetched once per (dataset, date) whatever the number of tickers, or per-stock monthly
+    tables for a few tickers over many dates. The fetches are spread over ``max_workers``
+    threads which all go through the same rate limiter; the result is always in date order
+    and has the same columns whichever source was used.
+
+    :param tickers: List of ticker symbols, or None for every security in the tables.
+    :param trading_days: Iterable of trading dates.
+    :param select_type: The type passed to FIP_trading_data.
+    :param rate_limiter: Rate limiter shared by the requests.
+    :param cache: Optional ResponseCache for the raw responses.
+    :param session: Optional Session for the requests.
+    :param max_workers: Number of threads fetching tables concurrently.
+    :param progress_name: Label of the progress bar, or None to disable it.
+    :param datasets: Datasets to fetch, any of 'prices', 'margin', 'ratios', 'institutional'.
+    :param columns: Optional output columns to keep. Datasets none of them belong to are not fetched.
+    :param plan: Optional dictionary of dataset -> 'daily' or 'monthly' overriding plan_requests.
+    :param proxy: Optional proxy settings, or a ProxyPool spreading the requests over several egress IPs.
+    :return type: DataFrame indexed by (Date, Ticker).
+    """
+    datasets, columns = select_columns(datasets, columns)
+    date_strs = [date.strftime('%Y%m%d') for date in trading_days]
+    if not date_strs:
+        return pd.DataFrame(columns=columns, index=pd.MultiIndex.from_arrays([[], []], names=['Date', 'Ticker']))
+
+    plan = {**plan_requests(len(tickers) if tickers is not None else None, date_strs, datasets), **(plan or {})}
+    column_maps = {}
+    for dataset in datasets:
+        source = MONTHLY_DATASET_COLUMNS[dataset] if plan[dataset] == 'monthly' else DATASET_COLUMNS[dataset]
+        column_maps[dataset] = {column: position for column, position in source.items() if column in columns}
+
+    month_dates = {}
+    for date_str in date_strs:
+        month_dates.setdefault(date_str[:6], []).append(date_str)
+
+    tables = {}
+    months = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {}
+        for date_str in date_strs:
+            for dataset in datasets:
+                if plan[dataset] == 'daily':
+                    futures[executor.submit(fetch_dataset, dataset, date_str, select_type, rate_limiter, cache,
+                                            session, proxy)] = (dataset, date_str)
+        for month in month_dates:
+            for dataset in datasets:
+                if plan[dataset] == 'monthly':
+                    for ticker in tickers:
+                        futures[executor.submit(fetch_monthly_dataset, dataset, ticker, month, rate_limiter, cache,
+                                                session, proxy)] = (dataset, month, ticker)
+
+        # A date is complete once its daily fetches and the monthly fetches of its month are done.
+        covered = {key: [key[1]] if len(key) == 2 else month_dates[key[1]] for key in futures.values()}
+        remaining = dict.fromkeys(date_strs, 0)
+        for dates in covered.values():
+            for date_str in dates:
+                remaining[date_str] += 1
+        completed = 0
+        try:
+            for future in as_completed(futures):
+                key = futures[future]
+                # Keep only the requested rows so the full-market table can be released right away.
+                if len(key) == 2:
+                    tables[key] = extract_tickers(future.result(), tickers, column_maps[key[0]])
+                else:
+                    months[key] = extract_month(future.result(), column_maps[key[0]])
+                done = 0
+                for date_str in covered[key]:
+                    remaining[date_str] -= 1
+                    done += remaining[date_str] == 0
+                completed += done
+                if progress_name is not None and done:
+                    simple_progress_bar(completed, len(date_strs), progress_name)
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+
+    frames = []
+    for date_str in date_strs:
+        parts = []
+        for dataset in datasets:
+            if plan[dataset] == 'daily':
+                parts.append(tables[dataset, date_str])
+            else:
+                rows = {ticker: months[dataset, date_str[:6], ticker].loc[date_str] for ticker in tickers
+                        if date_str in months[dataset, date_str[:6], ticker].index}
+                part = pd.DataFrame.from_dict(rows, orient='index', columns=list(column_maps[dataset]))
+                part.index.name = 'Ticker'
+                parts.append(part)
+        day = pd.concat(parts, axis=1)
+        if tickers is not None:
+            day = day.reindex(tickers)
+        day.index = pd.MultiIndex.from_product([[pd.to_datetime(date_str)], day.index], names=['Date', 'Ticker'])
+        frames.append(day)
+    return pd.concat(frames).reindex(columns=columns)
+
+
+def dataset_columns(datasets):
+    """
+    Return the output columns of ``datasets``, in the order of DATA_COLUMNS.
+    """
+    for dataset in datasets:
+        if dataset not in DATASET_COLUMNS:
+            raise ValueError(f"Unknown dataset: {dataset}")
+    return [column for column in DATA_COLUMNS[1:] if any(column in DATASET_COLUMNS[dataset] for dataset in datasets)]
+
+
+def select_columns(datasets, columns=None):
+    """
+    Resolve a dataset selection and an optional column projection.
+
+    :param datasets: Datasets to fetch, any of 'prices', 'margin', 'ratios', 'institutional'.
+    :param columns: Optional output columns to keep, e.g. ['Open', 'Close', 'Volume']. 'Date' is always kept.
+    :return: A (datasets, columns) tuple with only the datasets the columns come from.
+    :raises ValueError: When the selection leaves no dataset to fetch, e.g. datasets=[] or columns=['Date'].
+    """
+    available = dataset_columns(datasets)
+    if columns is None:
+        selected = tuple(datasets)
+    else:
+        columns = [column for column in dict.fromkeys(columns) if column != 'Date']
+        unknown = [column for column in columns if column not in available]
+        if unknown:
+            raise ValueError(f"Columns not in datasets {list(datasets)}: {unknown}")
+        selected = tuple(dataset for dataset in datasets if any(column in DATASET_COLUMNS[dataset] for column in columns))
+    if not selected:
+        raise ValueError(f"Nothing to download: select at least one dataset and one column besides 'Date' "
+                         f"(datasets={list(datasets)}, columns={columns})")
+    return selected, available if columns is None else columns
+
+
+def market_panel(start_date, end_date, datasets=tuple(DATASET_COLUMNS), select_type='ALLBUT0999', float32=False,
+                 rate_limiter=default_rate_limiter, cache=None, session=None, max_workers=1, chunk='month', columns=None,
+                 proxy=None):
+    """
+    Download the whole market over a date range as one panel.
+
+    Built on the same full-market tables as Ticker, so every day costs one request per
+    dataset. The tables are fetched and converted to numeric dtypes chunk by chunk, so
+    the raw strings of only one chunk are held at a time.
+
+    :param start_date: Start date (format: YYYYMMDD).
+    :param end_date: End date (format: YYYYMMDD).
+    :param datasets: Datasets to include, any of 'prices', 'margin', 'ratios', 'institutional'.
+    :param select_type: The type passed to FIP_trading_data.
+    :param float32: Store the numeric columns as float32, halving their memory. Large
+        values such as Transaction Value keep only about 7 significant digits.
+    :param rate_limiter: Rate limiter shared by the requests.
+    :param cache: Optional ResponseCache for the raw responses.
+    :param session: Optional Session for the requests.
+    :param max_workers: Number of threads fetching (dataset, date) tables concurrently.
+    :param chunk: 'day', 'week', 'month', 'year', or a number of trading days per chunk.
+    :param columns: Optional output columns to keep. Datasets none of them belong to are not fetched.
+    :param proxy: Optional proxy settings or ProxyPool for the requests.
+    :return type: DataFrame indexed by (Date, Ticker) with a categorical Ticker level and
+        the columns of DATA_COLUMNS that belong to ``datasets``.
+    """
+    datasets, columns = select_columns(datasets, columns)
+    trading_days = get_calendar_manager().get_trading_dates(start_date, end_date)
+    frames = [
+        convert_types(download_tickers(None, days, select_type, rate_limiter, cache, session, max_workers=max_workers,
+                                       progress_name=f"market {label}", datasets=datasets, columns=columns, proxy=proxy))
+        for label, days in chunk_trading_days(trading_days, chunk)
+    ]
+    if not frames:
+        return download_tickers(None, trading_days, datasets=datasets, columns=columns)
+
+    panel = categorical_tickers(pd.concat(frames))
+    if float32:
+        numeric = panel.select_dtypes(include='number').columns
+        panel[numeric] = panel[numeric].astype('float32')
+    return panel
+
+
+def categorical_tickers(df, categories=None):
+    """
+    Store the Ticker level of a (Date, Ticker) index as a categorical, as convert_types
+    does for the code columns.
+
+    :param df: DataFrame indexed by (Date, Ticker). Its index is replaced.
+    :param categories: Optional categories, e.g. the requested tickers, so frames downloaded
+        separately share one dtype and stay categorical when concatenated.
+    :return type: DataFrame.
+    """
+    tickers = pd.CategoricalIndex(df.index.get_level_values('Ticker'), categories=categories)
+    df.index = pd.MultiIndex.from_arrays([df.index.get_level_values('Date'), tickers], names=['Date', 'Ticker'])
+    return df
+
+
+def chunk_trading_days(trading_days, chunk='month'):
+    """
+    Split trading days into consecutive chunks.
+
+    :param trading_days: DatetimeIndex of trading dates.
+    :param chunk: 'day', 'week', 'month', 'year', or a number of trading days per chunk.
+    :return: Generator of (label, DatetimeIndex) tuples.
+    """
+    if isinstance(chunk, int):
+        for i in range(0, len(trading_days), chunk):
+            days = trading_days[i:i + chunk]
+            yield f"{days[0]:%Y%m%d}-{days[-1]:%Y%m%d}", days
+        return
+
+    freqs = {'day': 'D', 'week': 'W', 'month': 'M', 'year': 'Y'}
+    if chunk not in freqs:
+        raise ValueError(f"Unknown chunk: {chunk}")
+    periods = trading_days.to_period(freqs[chunk])
+    for period in periods.unique():
+        yield str(period), trading_days[periods == period]
 
-calendar_manager = CalendarManager()
-# Global default rate limiter
-# No idea how to remove it.
-default_rate_limiter = RateLimiter(rate_limit=5, period=5, enabled = False)
 
 class Ticker:
-    def __init__(self, ticker, rate_limiter=default_rate_limiter):
+    def __init__(self, ticker, rate_limiter=default_rate_limiter, cache=None, session=None, proxy=None):
         self.ticker = ticker
         self.rate_limiter = rate_limiter
-        self.data_columns = [
-            'Date', 'Open', 'High', 'Low', 'Close', 'Volume', 'Transaction Value',
-            'Margin Buy', 'Margin Sell', 'Margin Cash Repay', 'Margin Previous Balance', 'Margin Current Balance', 'Margin Next Limit',
-            'Short Buy', 'Short Sell', 'Short Repay', 'Short Previous Balance', 'Short Current Balance', 'Short Next Limit', 'Offset',
-            'Dividend Yield', 'PE Ratio', 'PB Ratio',
-            'FII Buy', 'FII Sell', 'FII Net Buy/Sell', 'Proprietary Buy', 'Proprietary Sell', 'Proprietary Net Buy/Sell',
-            'IT Buy', 'IT Sell', 'IT Net Buy/Sell', 'PT Net Buy/Sell', 'PT Buy (Self-trading)', 'PT Sell (Self-trading)',
-            'PT Net Buy/Sell (Self-trading)', 'PT Buy (Hedging)', 'PT Sell (Hedging)', 'PT Net Buy/Sell (Hedging)', 'Three Institutional Investors Net Buy/Sell'
-        ]
+        self.cache = cache
+        self.session = session
+        self.proxy = proxy
+        self.data_columns = list(DATA_COLUMNS)
         self.data = pd.DataFrame(columns=self.data_columns)
 
-    def download(self, start_date, end_date, select_type='ALLBUT0999'):
-        trading_days = calendar_manager.get_trading_dates(start_date, end_date)
-        total_days = len(trading_days)
-        data_list = []
-
-        for i, date in enumerate(trading_days, 1):
-            date_str = date.strftime('%Y%m%d')
-            date = pd.to_datetime(date_str)
-            row_data = {'Date': date}
-
-            row_data.update(self._fetch_daily_closing_prices(date_str))
-            row_data.update(self._fetch_margin_trading(date_str))
-            row_data.update(self._fetch_daily_stock_ratios(date_str))
-            row_data.update(self._fetch_FIP_trading_data(date_str, select_type))
-
-            data_list.append(row_data)
-            simple_progress_bar(i, total_days, self.ticker)
-
-        if data_list:
-            new_data = pd.DataFrame(data_list, columns=self.data_columns)
-            self.data = pd.concat([self.data, new_data], ignore_index=True)
-
-    def _fetch_daily_closing_prices(self, date_str):
-        df = daily_closing_prices(date_str, 'ALL', 8, rate_limiter=self.rate_limiter)
-        if df is not None and not df.empty:
-            stock_data = df[df.iloc[:, 0] == self.ticker]
-            if not stock_data.empty:
-                stock_data = stock_data.iloc[0]
-                return {
-                    'Open': stock_data.iloc[5],
-                    'High': stock_data.iloc[6],
-                    'Low': stock_data.iloc[7],
-                    'Close': stock_data.iloc[8],
-                    'Volume': stock_data.iloc[2],
-                    'Transaction Value': stock_data.iloc[4]
-                }
-        return {}
-
-    def _fetch_margin_trading(self, date_str):
-        df = margin_trading(date_str, rate_limiter=self.rate_limiter)
-        if df is not None and not df.empty:
-            margin_data = df[df.iloc[:, 0] == self.ticker]
-            if not margin_data.empty:
-                margin_data = margin_data.iloc[0]
-                return {
-                    'Margin Buy': margin_data.iloc[2],
-                    'Margin Sell': margin_data.iloc[3],
-                    'Margin Cash Repay': margin_data.iloc[4],
-                    'Margin Previous Balance': margin_data.iloc[5],
-                    'Margin Current Balance': margin_data.iloc[6],
-                    'Margin Next Limit': margin_data.iloc[7],
-                    'Short Buy': margin_data.iloc[8],
-                    'Short Sell': margin_data.iloc[9],
-                    'Short Repay': margin_data.iloc[10],
-                    'Short Previous Balance': margin_data.iloc[11],
-                    'Short Current Balance': margin_data.iloc[12],
-                    'Short Next Limit': margin_data.iloc[13],
-                    'Offset': margin_data.iloc[14]
-                }
-        return {}
-
-    def _fetch_daily_stock_ratios(self, date_str):
-        df = daily_stock_ratios(date_str, 'ALL', rate_limiter=self.rate_limiter)
-        if df is not None and not df.empty:
-            ratio_data = df[df.iloc[:, 0] == self.ticker]
-            if not ratio_data.empty:
-                ratio_data = ratio_data.iloc[0]
-                return {
-                    'Dividend Yield': ratio_data.iloc[2],
-                    'PE Ratio': ratio_data.iloc[4],
-                    'PB Ratio': ratio_data.iloc[5]
-                }
-        return {}
-
-    def _fetch_FIP_trading_data(self, date_str, select_type='ALL'):
-        df = FIP_trading_data(date_str, select_type, rate_limiter=self.rate_limiter)
-        if df is not None and not df.empty:
-            fip_data = df[df.iloc[:, 0] == self.ticker]
-            if not fip_data.empty:
-                fip_data = fip_data.iloc[0]
-                return {
-                    'FII Buy': fip_data.iloc[2],
-                    'FII Sell': fip_data.iloc[3],
-                    'FII Net Buy/Sell': fip_data.iloc[4],
-                    'Proprietary Buy': fip_data.iloc[5],
-                    'Proprietary Sell': fip_data.iloc[6],
-                    'Proprietary Net Buy/Sell': fip_data.iloc[7],
-                    'IT Buy': fip_data.iloc[8],
-                    'IT Sell': fip_data.iloc[9],
-                    'IT Net Buy/Sell': fip_data.iloc[10],
-                    'PT Net Buy/Sell': fip_data.iloc[11],
-                    'PT Buy (Self-trading)': fip_data.iloc[12],
-                    'PT Sell (Self-trading)': fip_data.iloc[13],
-                    'PT Net Buy/Sell (Self-trading)': fip_data.iloc[14],
-                    'PT Buy (Hedging)': fip_data.iloc[15],
-                    'PT Sell (Hedging)': fip_data.iloc[16],
-                    'PT Net Buy/Sell (Hedging)': fip_data.iloc[17],
-                    'Three Institutional Investors Net Buy/Sell': fip_data.iloc[18]
-                }
-        return {}
+    def download(self, start_date, end_date, select_type='ALLBUT0999', max_workers=1, typed=False,
+                 datasets=tuple(DATASET_COLUMNS), columns=None):
+        """
+        Download the ticker between start_date and end_date and append it to self.data.
+
+        :param datasets: Datasets to fetch, any of 'prices', 'margin', 'ratios', 'institutional'.
+            Only their endpoints are requested and only their columns are filled.
+        :param columns: Optional columns to keep, e.g. ['Open', 'High', 'Low', 'Close', 'Volume'].
+            Datasets none of them belong to are not requested.
+        """
+        trading_days = get_calendar_manager().get_trading_dates(start_date, end_date)
+        if len(trading_days) == 0:
+            return
+
+        new_data = self._download(trading_days, select_type, max_workers, typed, self.ticker, datasets, columns)
+        self.data = pd.concat([self.data, new_data], ignore_index=True) if not self.data.empty else new_data
+
+    def iter_download(self, start_date, end_date, select_type='ALLBUT0999', chunk='month', max_workers=1, typed=True,
+                      datasets=tuple(DATASET_COLUMNS), columns=None):
+        """
+        Download chunk by chunk, yielding each chunk as soon as its dates are fetched.
+
+        Nothing is kept in self.data, so memory stays flat however long the range is,
+        and chunks already yielded survive a failure further on.
+
+        :param chunk: 'day', 'week', 'month', 'year', or a number of trading days per chunk.
+        :param datasets: Datasets to fetch, as in download().
+        :param columns: Optional columns to keep, as in download().
+        :return: Generator of DataFrames in the layout of Ticker.data.
+        """
+        trading_days = get_calendar_manager().get_trading_dates(start_date, end_date)
+        for label, days in chunk_trading_days(trading_days, chunk):
+            yield self._download(days, select_type, max_workers, typed, f"{self.ticker} {label}", datasets, columns)
+
+    def _download(self, trading_days, select_type, max_workers, typed, progress_name, datasets, columns):
+        new_data = download_tickers([self.ticker], trading_days, select_type, self.rate_limiter, self.cache, self.session,
+                                    max_workers=max_workers, progress_name=progress_name, datasets=datasets,
+                                    columns=columns, proxy=self.proxy)
+        new_data = new_data.xs(self.ticker, level='Ticker').reset_index()
+        return convert_types(new_data) if typed else new_data
+
+    def analytics(self, **kwargs):
+        """
+        Return RollingAnalytics over self.data. Pass it the rows of later downloads with
+        append() to update the indicators without recomputing the history.
+
+        :param kwargs: Passed to RollingAnalytics, e.g. sma_windows or percentile_window.
+        """
+        return RollingAnalytics(self.data, **kwargs)
+
+
+class Tickers:
+    """
+    Download several tickers at once, sharing every full-market request between them.
+    """
+
+    def __init__(self, tickers, rate_limiter=default_rate_limiter, cache=None, session=None, proxy=None):
+        self.tickers = list(dict.fromkeys(tickers))
+        self.rate_limiter = rate_limiter
+        self.cache = cache
+        self.session = session
+        self.proxy = proxy
+        self.data_columns = list(DATA_COLUMNS)
+        self.data = pd.DataFrame(columns=self.data_columns[1:], index=pd.MultiIndex.from_arrays([[], []], names=['Date', 'Ticker']))
+
+    def download(self, start_date, end_date, select_type='ALLBUT0999', max_workers=1, typed=False,
+                 datasets=tuple(DATASET_COLUMNS), columns=None):
+        """
+        Download the tickers between start_date and end_date and append them to self.data.
+
+        :param datasets: Datasets to fetch, as in Ticker.download().
+        :param columns: Optional columns to keep, as in Ticker.download().
+        """
+        trading_days = get_calendar_manager().get_trading_dates(start_date, end_date)
+        if len(trading_days) == 0:
+            return
+
+        new_data = self._download(trading_days, select_type, max_workers, typed, f"{len(self.tickers)} tickers", datasets,
+                                  columns)
+        self.data = pd.concat([self.data, new_data]) if not self.data.empty else new_data
+
+    def iter_download(self, start_date, end_date, select_type='ALLBUT0999', chunk='month', max_workers=1, typed=True,
+                      datasets=tuple(DATASET_COLUMNS), columns=None):
+        """
+        Download chunk by chunk, yielding each chunk as soon as its dates are fetched.
+        Nothing is kept in self.data.
+
+        :param chunk: 'day', 'week', 'month', 'year', or a number of trading days per chunk.
+        :param datasets: Datasets to fetch, as in Ticker.download().
+        :param columns: Optional columns to keep, as in Ticker.download().
+        :return: Generator of DataFrames indexed by (Date, Ticker).
+        """
+        trading_days = get_calendar_manager().get_trading_dates(start_date, end_date)
+        for label, days in chunk_trading_days(trading_days, chunk):
+            yield self._download(days, select_type, max_workers, typed, f"{len(self.tickers)} tickers {label}", datasets,
+                                 columns)
+
+    def _download(self, trading_days, select_type, max_workers, typed, progress_name, datasets, columns):
+        new_data = download_tickers(self.tickers, trading_days, select_type, self.rate_limiter, self.cache, self.session,
+                                    max_workers=max_workers, progress_name=progress_name, datasets=datasets,
+                                    columns=columns, proxy=self.proxy)
+        if not typed:
+            return new_data
+        return categorical_tickers(convert_types(new_data), categories=self.tickers)
+
+    def analytics(self, **kwargs):
+        """
+        Return RollingAnalytics over self.data, one series per ticker.
+
+        :param kwargs: Passed to RollingAnalytics, e.g. sma_windows or percentile_window.
+        """
+        return RollingAnalytics(self.data, **kwargs)
+
+    def __getitem__(self, ticker):
+        """
+        Return the data of one ticker in the same layout as Ticker.data.
+        """
+        if ticker not in self.tickers:
+            raise KeyError(ticker)
+        if self.data.empty:
+            return pd.DataFrame(columns=['Date'] + list(self.data.columns))
+        return self.data.xs(ticker, level='Ticker').reset_index()
+
+    def to_dict(self):
+        """
+        Return one DataFrame per ticker, keyed by ticker symbol.
+        """
+        return {ticker: self[ticker] for ticker in self.tickers}
+
+
+def __getattr__(name):
+    # calendar_manager used to be built at import time; keep it reachable, built on first use.
+    if name == 'calendar_manager':
+        return get_calendar_manager()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # Usage example:
 # ticker = Ticker('2330')  # Example ticker symbol for TSMC
 # ticker.download('20230601', '20230630')
 # print(ticker.data)
+#
+# tickers = Tickers(['2330', '2454'])
+# tickers.download('20230601', '20230630')
+# print(tickers.data)          # (Date, Ticker) MultiIndex
+# print(tickers['2454'])       # same layout as Ticker.data
+#
+# for chunk in Ticker('2330').iter_download('20200101', '20231231', chunk='month'):
+#     chunk.to_csv('2330.csv', mode='a', header=False, index=False)
+#
+# ohlcv = Ticker('2330')
+# ohlcv.download('20230601', '20230630', datasets=['prices'])   # prices only: one STOCK_DAY request per month
+#
+# panel = market_panel('20240601', '20240630', datasets=['prices', 'ratios'], float32=True)
+# panel.xs('2330', level='Ticker')
+
@@ -15,46 +15,121 @@
 # Your Python code starts here
 
 
+import os
 import re
 import sys
+import json
 import time
+import random
 import logging
 import requests
+import requests.adapters
 import threading
+from contextlib import contextmanager
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+from . import cache as response_cache
+from .cache import CachedResponse
+from .exceptions import RequestFailedException
+from .metrics import default_metrics, endpoint_name
+
+logger = logging.getLogger('twsepy')
 
 
 class RateLimiter:
     """
-    Implement rate limiting using threading lock and timestamp.
+    Implement rate limiting using a token bucket.
+
+    Tokens are refilled at `rate_limit / period` per second up to `capacity`, so up to
+    `capacity` requests can go out back to back before the steady rate applies. With
+    the default capacity of 1 requests are simply spaced `period / rate_limit` apart.
+
+    When `adaptive` is enabled the refill rate follows AIMD: it is cut by
+    `decrease_factor` whenever a response shows throttling or an error, and grows back
+    by `increase_step` per successful response until it reaches `rate_limit` again.
     """
 
-    def __init__(self, rate_limit = 1, period = 1, enabled = True):
+    def __init__(self, rate_limit = 1, period = 1, enabled = True, capacity = 1, adaptive = False,
+                 min_rate_limit = None, increase_step = None, decrease_factor = 0.5):
         """
         Initialize RateLimiter instance.
 
         :param rate_limit: Maximum number of requests allowed in the specified period.
         :param period: Time period in seconds.
+        :param enabled: Enable or disable rate limiting.
+        :param capacity: Maximum number of requests allowed in a burst.
+        :param adaptive: Back off automatically when responses show throttling or errors.
+        :param min_rate_limit: Lowest rate_limit the adaptive mode backs off to. Defaults to 5% of rate_limit.
+        :param increase_step: rate_limit recovered per successful response. Defaults to 5% of rate_limit.
+        :param decrease_factor: Factor applied to the current rate_limit on throttling.
         """
         self.rate_limit = rate_limit
         self.period = period
         self.enabled = enabled
+        self.capacity = capacity
+        self.adaptive = adaptive
+        self.min_rate_limit = min_rate_limit if min_rate_limit is not None else rate_limit * 0.05
+        self.increase_step = increase_step if increase_step is not None else rate_limit * 0.05
+        self.decrease_factor = decrease_factor
         self.lock = threading.Lock()
-        self.last_request_time = 0
+        self.current_rate_limit = rate_limit
+        self.tokens = capacity
+        self.last_refill = self._now()
 
     def limit(self):
         """
-        Check the time elapsed since the last request, and if it is less than the rate limit,
-        wait for the remaining time.
+        Take one token from the bucket, and if none is available, wait until it is refilled.
+        The lock is only held while reserving the token, not while waiting for it.
+        """
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    def reserve(self):
+        """
+        Take one token from the bucket without waiting.
+
+        :return: Seconds the caller has to wait before sending its request.
         """
         if not self.enabled:
-            return
+            return 0.0
 
         with self.lock:  # Ensure thread safety in a multithreaded environment
-            now = time.time()
-            elapsed = now - self.last_request_time
-            if elapsed < self.period / self.rate_limit:
-                time.sleep(self.period / self.rate_limit - elapsed)
-            self.last_request_time = time.time()
+            with self._shared_state():
+                return self._reserve(self._now())
+
+    def wait_time(self):
+        """
+        Return how many seconds a call to limit() would wait right now, without taking a token.
+        """
+        if not self.enabled:
+            return 0.0
+
+        with self.lock:
+            with self._shared_state():
+                self._refill(self._now())
+                return max(0.0, (1 - self.tokens) / self._rate())
+
+    def record(self, throttled):
+        """
+        Feed the outcome of a request back to the adaptive mode.
+
+        :param throttled: True if the response showed throttling or an error.
+        """
+        if not self.adaptive:
+            return
+
+        with self.lock:
+            with self._shared_state():
+                self._refill(self._now())
+                if throttled:
+                    self.current_rate_limit = max(self.min_rate_limit, self.current_rate_limit * self.decrease_factor)
+                    self.tokens = min(self.tokens, 0)  # Stop any burst in progress
+                else:
+                    self.current_rate_limit = min(self.rate_limit, self.current_rate_limit + self.increase_step)
 
     def set_rate_limit(self, new_rate_limit):
         """
@@ -64,6 +139,7 @@ class RateLimiter:
         """
         with self.lock:
             self.rate_limit = new_rate_limit
+            self.current_rate_limit = new_rate_limit
 
     def set_period(self, new_period):
         """
@@ -74,49 +150,441 @@ class RateLimiter:
         with self.lock:
             self.period = new_period
 
+    def set_enabled(self, enabled):
+        """
+        Enable or disable rate limiting.
+        """
+        self.enabled = enabled
+
     def enable(self):
-        self.enabled(True)
+        self.set_enabled(True)
 
     def disable(self):
-        self.enabled(False)
+        self.set_enabled(False)
+
+    def __getstate__(self):
+        # Locks cannot be pickled; a copy sent to another process gets its own. Only
+        # FileRateLimiter copies keep sharing one budget there.
+        state = self.__dict__.copy()
+        del state['lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.lock = threading.Lock()
+
+    def _rate(self):
+        return self.current_rate_limit / self.period
+
+    def _now(self):
+        return time.monotonic()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self._rate())
+        self.last_refill = now
+
+    def _reserve(self, now):
+        # Tokens may go negative: each missing token is a reservation further in the future.
+        self._refill(now)
+        self.tokens -= 1
+        return -self.tokens / self._rate() if self.tokens < 0 else 0.0
+
+    @contextmanager
+    def _shared_state(self):
+        yield
+
+
+class FileRateLimiter(RateLimiter):
+    """
+    RateLimiter whose bucket lives in a file, so every process on the host that uses
+    the same path shares one request budget. The file is guarded by an OS-level lock.
+    """
+
+    def __init__(self, path, rate_limit = 1, period = 1, enabled = True, capacity = 1, **kwargs):
+        """
+        Initialize FileRateLimiter instance.
+
+        :param path: State file shared by the processes.
+        Other parameters are the same as RateLimiter.
+        """
+        self.path = os.path.expanduser(path)
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        super().__init__(rate_limit, period, enabled, capacity, **kwargs)
+
+    def _now(self):
+        return time.time()  # Comparable across processes, unlike time.monotonic()
+
+    @contextmanager
+    def _shared_state(self):
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        with os.fdopen(fd, 'r+') as f:
+            _lock_file(f)
+            try:
+                content = f.read()
+                if content:
+                    state = json.loads(content)
+                    self.tokens = state['tokens']
+                    self.last_refill = state['last_refill']
+                    self.current_rate_limit = state['current_rate_limit']
+                yield
+                f.seek(0)
+                f.truncate()
+                f.write(json.dumps({
+                    'tokens': self.tokens,
+                    'last_refill': self.last_refill,
+                    'current_rate_limit': self.current_rate_limit,
+                }))
+                f.flush()
+            finally:
+                _unlock_file(f)
+
+
+def _lock_file(f):
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+    else:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        f.seek(0)
+
+
+def _unlock_file(f):
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+    else:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def is_throttled(response):
+    """
+    Check whether a response shows throttling or a server error.
+    """
+    return response.status_code in (403, 429) or response.status_code >= 500
 
 
 # Global default rate limiter
 default_rate_limiter = RateLimiter(rate_limit=5, period=5, enabled = False)
 
-def limited_request(url, headers=None, params=None, proxy=None, rate_limiter=default_rate_limiter):
+
+class ProxyPool:
     """
-    Send a rate-limited HTTP GET request and log the request details.
+    Egress proxies with a RateLimiter and a health state each.
+
+    TWSE throttles per source IP, so every proxy gets its own request budget and the
+    pool's throughput grows with the number of proxies. Each request goes to the
+    healthy proxy whose limiter has a token soonest. A proxy that fails `max_failures`
+    times in a row (connection errors, timeouts, 403, 429, 5xx) is ejected for
+    `cooldown` seconds, then re-admitted on probation: one more failure ejects it again
+    for twice as long, one success restores it.
+
+    Pass a ProxyPool wherever a `proxy` is accepted: the core functions, Ticker, Tickers.
+    """
+
+    def __init__(self, proxies, rate_limit=5, period=5, capacity=1, max_failures=3, cooldown=60, adaptive=False):
+        """
+        Initialize ProxyPool instance.
+
+        :param proxies: Proxy URLs, e.g. ['http://10.0.0.1:3128', 'http://10.0.0.2:3128'], or
+            dictionaries in the requests `proxies` format.
+        :param rate_limit: Maximum number of requests per proxy in the specified period.
+        :param period: Time period in seconds.
+        :param capacity: Maximum number of requests allowed in a burst, per proxy.
+        :param max_failures: Consecutive failures after which a proxy is ejected.
+        :param cooldown: Seconds an ejected proxy stays out of the pool the first time.
+        :param adaptive: Use adaptive RateLimiters, backing off a proxy that gets throttled.
+        """
+        if not proxies:
+            raise ValueError("ProxyPool needs at least one proxy")
+        self.max_failures = max_failures
+        self.cooldown = cooldown
+        self.lock = threading.Lock()
+        self.turn = 0
+        self.proxies = [
+            _PoolProxy(proxy if isinstance(proxy, dict) else {'http': proxy, 'https': proxy},
+                       RateLimiter(rate_limit, period, capacity=capacity, adaptive=adaptive))
+            for proxy in proxies
+        ]
+
+    def acquire(self):
+        """
+        Pick the proxy for the next request and take a token from its limiter.
+
+        When every proxy is ejected, the one re-admitted first is used once its cooldown ends.
+
+        :return: A (proxy, wait) tuple: the proxy to pass to release(), and the seconds to
+            wait before sending the request through it.
+        """
+        with self.lock:
+            now = time.monotonic()
+            healthy = [proxy for proxy in self.proxies if proxy.ejected_until <= now]
+            if healthy:
+                # Rotate the candidates so that ties, e.g. several idle proxies, are broken round-robin.
+                self.turn = (self.turn + 1) % len(healthy)
+                healthy = healthy[self.turn:] + healthy[:self.turn]
+                proxy = min(healthy, key=lambda proxy: proxy.rate_limiter.wait_time())
+                wait = proxy.rate_limiter.reserve()
+            else:
+                proxy = min(self.proxies, key=lambda proxy: proxy.ejected_until)
+                wait = proxy.ejected_until - now + proxy.rate_limiter.reserve()
+            proxy.requests += 1
+            return proxy, wait
+
+    def release(self, proxy, failed):
+        """
+        Record the outcome of a request sent through a proxy.
+
+        :param proxy: The proxy returned by acquire().
+        :param failed: True on a connection error, a timeout or a throttled/error response.
+        """
+        proxy.rate_limiter.record(failed)
+        with self.lock:
+            if not failed:
+                proxy.failures = 0
+                proxy.ejections = 0
+                return
+            if proxy.ejected_until > time.monotonic():
+                return  # A request sent before the proxy was ejected
+            proxy.failures += 1
+            if proxy.failures >= self.max_failures:
+                proxy.ejected_until = time.monotonic() + self.cooldown * 2 ** proxy.ejections
+                proxy.ejections += 1
+                proxy.failures = self.max_failures - 1  # On probation once re-admitted
+                logger.warning("Proxy %s ejected for %.1fs", proxy.url, proxy.ejected_until - time.monotonic())
+
+    def stats(self):
+        """
+        Return the state of every proxy: URL, healthy, consecutive failures and requests sent.
+        """
+        now = time.monotonic()
+        with self.lock:
+            return [{'proxy': proxy.url, 'healthy': proxy.ejected_until <= now, 'failures': proxy.failures,
+                     'requests': proxy.requests} for proxy in self.proxies]
+
+
+class _PoolProxy:
+    def __init__(self, proxies, rate_limiter):
+        self.proxies = proxies
+        self.url = proxies.get('https') or proxies.get('http')
+        self.rate_limiter = rate_limiter
+        self.failures = 0
+        self.ejections = 0
+        self.ejected_until = 0.0
+        self.requests = 0
+
+
+class Session(requests.Session):
+    """
+    Shared HTTP session with connection pooling, keep-alive and compressed transfer.
+
+    limited_request reads `timeout`, `retries` and `backoff` from the session it uses;
+    connection errors, timeouts, 429 and 5xx responses are retried with jittered
+    exponential backoff.
+    """
+
+    __attrs__ = requests.Session.__attrs__ + ['timeout', 'retries', 'backoff']  # Kept when pickled
+
+    def __init__(self, pool_size=10, timeout=30, retries=3, backoff=0.5):
+        """
+        Initialize Session instance.
+
+        :param pool_size: Maximum number of pooled connections per host. Use at least the number of threads.
+        :param timeout: Timeout of one request in seconds.
+        :param retries: Number of retries after the first attempt.
+        :param backoff: Base delay in seconds, doubled on every retry.
+        """
+        super().__init__()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.mount('https://', adapter)
+        self.mount('http://', adapter)
+        self.headers.update({'Accept-Encoding': 'gzip, deflate', 'Connection': 'keep-alive'})
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+
+
+# Global default session, created on first use.
+default_session = None
+_default_session_lock = threading.Lock()
+
+
+def get_default_session():
+    """
+    Return the session used when none is passed explicitly.
+    """
+    global default_session
+    with _default_session_lock:
+        if default_session is None:
+            default_session = Session()
+        return default_session
+
+
+def set_default_session(session):
+    """
+    Replace the session used when none is passed explicitly.
+
+    :param session: A Session or any requests.Session, e.g. one pointed at a local server.
+    """
+    global default_session
+    with _default_session_lock:
+        default_session = session
+
+
+def limited_request(url, headers=None, params=None, proxy=None, rate_limiter=default_rate_limiter, cache=None, session=None):
+    """
+    Send a rate-limited HTTP GET request, log it and record its metrics in
+    twsepy.metrics.default_metrics.
 
     :param url: The requested URL.
     :param headers: The request headers.
     :param params: The request parameters.
-    :param proxy: Proxy settings. Can be a string or a dictionary with 'https' key.
+    :param proxy: Proxy settings. Can be a string, a dictionary with 'https' key, or a ProxyPool
+        spreading the requests over its proxies, each with its own rate limiter.
+    :param cache: Optional ResponseCache. Defaults to twsepy.cache.default_cache; False bypasses every cache.
+    :param session: Optional Session. Defaults to the shared session from get_default_session().
     :return: The response object.
     """
-    rate_limiter.limit()  # Apply rate limiting
-
+    endpoint = endpoint_name(url)
+    if cache is None:
+        cache = response_cache.default_cache
+    elif cache is False:
+        cache = None
+    if cache is not None:
+        entry = cache.get_entry(url, params)
+        if entry is not None:
+            default_metrics.record('cache_hits_total', endpoint)
+            return CachedResponse(*entry)
+        default_metrics.record('cache_misses_total', endpoint)
+
+    pool = proxy if isinstance(proxy, ProxyPool) else None
     if proxy and isinstance(proxy, dict) and "https" in proxy:
         proxy = {"https": proxy["https"]}
     elif proxy and isinstance(proxy, str):
         proxy = {"https": proxy}
 
-    response = requests.get(url, headers=headers, params=params, proxies=proxy)
-    log_request(url, params, response)
+    session = session or get_default_session()
+    timeout = getattr(session, 'timeout', 30)
+    retries = getattr(session, 'retries', 0)
+    backoff = getattr(session, 'backoff', 0.5)
+
+    for attempt in range(retries + 1):
+        if attempt:
+            default_metrics.record('retries_total', endpoint)
+        with default_metrics.timer('rate_limit_wait_seconds', endpoint):
+            rate_limiter.limit()  # Apply rate limiting
+            if pool is not None:  # Every attempt may go through a different proxy
+                pool_proxy, wait = pool.acquire()
+                proxy = pool_proxy.proxies
+                time.sleep(max(0.0, wait))
+        start = time.perf_counter()
+        try:
+            response = session.get(url, headers=headers, params=params, proxies=proxy, timeout=timeout)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            rate_limiter.record(True)
+            if pool is not None:
+                pool.release(pool_proxy, True)
+            default_metrics.record('errors_total', endpoint)
+            if attempt == retries:
+                raise RequestFailedException(f"Failed to retrieve {url} with {params}: {e}") from e
+        else:
+            elapsed = time.perf_counter() - start
+            rate_limiter.record(is_throttled(response))
+            if pool is not None:
+                pool.release(pool_proxy, is_throttled(response))
+            default_metrics.record('requests_total', endpoint)
+            default_metrics.record('request_seconds', endpoint, elapsed)
+            default_metrics.record('response_bytes', endpoint, len(response.content))
+            if response.status_code not in (200, 304):
+                default_metrics.record('errors_total', endpoint)
+            log_request(url, params, response, elapsed)
+            if not (response.status_code == 429 or response.status_code >= 500) or attempt == retries:
+                break
+        time.sleep(backoff * 2 ** attempt * random.uniform(0.5, 1.5))
+
+    if cache is not None and response.status_code == 200 and response.text.lstrip().startswith('{'):
+        cache.set(url, params, response.text)
     return response
 
 
-def log_request(url, params, response):
+def log_request(url, params, response, elapsed=None):
     """
-    Log each HTTP request including the requested URL, parameters, and response status code.
+    Log one HTTP request on the 'twsepy' logger: URL, parameters, status code, size and time.
+    Nothing is formatted unless INFO is enabled for that logger.
 
     :param url: The requested URL.
     :param params: The request parameters.
     :param response: The response object.
+    :param elapsed: Request time in seconds.
+    """
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("GET %s params=%s status=%s bytes=%d elapsed=%.3fs",
+                    url, params, response.status_code, len(response.content), elapsed or 0.0)
+
+
+class SingleFlight:
     """
-    logging.info(f"Requested URL: {url}")
-    logging.info(f"Parameters: {params}")
-    logging.info(f"Response Status Code: {response.status_code}")
+    Coalesce concurrent calls that share a key.
+
+    The first caller of a key runs the function; callers arriving while it is in flight
+    wait for it and receive the same result or exception. The key is released as soon
+    as the call finishes, so nothing is cached beyond that.
+    """
+
+    def __init__(self, copy=None):
+        """
+        Initialize SingleFlight instance.
+
+        :param copy: Optional function copying a result, e.g. DataFrame.copy. The waiting
+            callers then each get their own copy, taken from a snapshot made before the
+            first caller gets the result back, so changes it makes are never seen by them.
+        """
+        self.copy = copy
+        self.lock = threading.Lock()
+        self.calls = {}
+
+    def do(self, key, func, *args, **kwargs):
+        """
+        Run func(*args, **kwargs), or wait for the in-flight call of the same key.
+
+        :param key: Hashable key identifying identical calls.
+        :return: A (result, shared) tuple; shared is True for callers that waited on another call.
+        """
+        with self.lock:
+            call = self.calls.get(key)
+            leader = call is None
+            if leader:
+                call = self.calls[key] = _Call()
+            else:
+                call.waiters += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return (self.copy(call.result) if self.copy else call.result), True
+
+        result = None
+        try:
+            result = func(*args, **kwargs)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self.lock:
+                del self.calls[key]
+            if call.error is None:
+                # No caller can join any more; snapshot the result before the leader can change it.
+                call.result = self.copy(result) if self.copy and call.waiters else result
+            call.done.set()
+        return result, False
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
 
 
 def simple_progress_bar(current, total, ticker_name, bar_length=40):
@@ -135,6 +603,9 @@ def simple_progress_bar(current, total, ticker_name, bar_length=40):
     sys.stdout.flush()
 
 
+HTML_TAG_RE = re.compile('<.*?>')
+
+
 def remove_html_tags(text):
     """
     Remove HTML tags from a string.
@@ -142,17 +613,17 @@ def remove_html_tags(text):
     :param text: The input string with HTML tags.
     :return: A string without HTML tags.
     """
-    clean = re.compile('<.*?>')
-    return re.sub(clean, '', text)
+    return HTML_TAG_RE.sub('', text)
 
 
-"""
-Future Development Notes:
+def remove_html_tags_series(series):
+    """
+    Remove HTML tags from every string of a Series.
 
-1. Implement a thread pool to manage and allocate threads for handling a large number of concurrent requests.
-2. Extend the RateLimiter class to support more rate limiting strategies, such as the token bucket algorithm.
-3. Add exception handling to manage various exceptions that may occur during network requests.
-4. Provide configurable logging levels and formats to suit different needs.
+    Columns with HTML, such as the MI_INDEX sign column, hold only a handful of distinct
+    values, so each distinct value is cleaned once and mapped back onto the column.
 
-Future developers can expand functionality based on these notes.
-"""
+    :param series: Series of strings with HTML tags.
+    :return: Series of strings without HTML tags.
+    """
+    return series.map({value: remove_html_tags(value) for value in series.unique() if isinstance(value, str)})
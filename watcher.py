@@ -0,0 +1,219 @@
+# Copyright 2024 JayC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Your Python code starts here
+
+
+import time
+import random
+import pandas as pd
+from datetime import datetime, timedelta
+from datetime import time as clock_time
+from .config import DEFAULT_HEADERS, BASE_URL
+from .cache import TAIPEI, is_closed
+from .core import (decode_json, parse_daily_closing_prices, parse_margin_trading, parse_daily_stock_ratios,
+                   parse_FIP_trading_data)
+from .dtypes import convert_types
+from .exceptions import CrawlerException
+from .metrics import default_metrics, endpoint_name
+from .no_data import record_empty
+from .utils import limited_request, default_rate_limiter, logger
+
+# Endpoint path and parameters polled for each dataset; None stands for the watcher's select_type.
+WATCH_REQUESTS = {
+    'prices': ('afterTrading/MI_INDEX', {'type': 'ALL'}),
+    'margin': ('marginTrading/MI_MARGN', {'selectType': 'STOCK'}),
+    'ratios': ('afterTrading/BWIBBU_d', {'selectType': 'ALL'}),
+    'institutional': ('fund/T86', {'selectType': None}),
+}
+
+# Earliest time (Taipei) each dataset is usually published after the close; nothing is
+# polled before it.
+PUBLISH_SCHEDULE = {
+    'prices': clock_time(13, 45),
+    'ratios': clock_time(14, 30),
+    'institutional': clock_time(15, 0),
+    'margin': clock_time(21, 0),
+}
+
+
+class PublishWatcher:
+    """
+    Poll the TWSE until the tables of one date are published, yielding each as it lands.
+
+    Each dataset is polled on its own schedule, starting at its PUBLISH_SCHEDULE time,
+    every min_interval seconds at first and backing off towards max_interval while it is
+    still missing. Polls send the ETag / Last-Modified of the previous answer back as
+    If-None-Match / If-Modified-Since, so a server that supports them answers an unchanged
+    table with an empty 304; otherwise an unpublished table costs TWSE's small "no data"
+    payload. The response cache is bypassed, since it would keep serving the "no data"
+    answer for its ttl.
+    """
+
+    def __init__(self, date=None, datasets=tuple(WATCH_REQUESTS), schedule=None, min_interval=15, max_interval=120,
+                 backoff=1.5, deadline=None, select_type='ALLBUT0999', typed=False, proxy=None,
+                 rate_limiter=default_rate_limiter, session=None):
+        """
+        Initialize PublishWatcher instance.
+
+        :param date: The date to watch (format: YYYYMMDD). Defaults to today in Taipei.
+        :param datasets: Datasets to watch, any of 'prices', 'margin', 'ratios', 'institutional'.
+        :param schedule: Optional dictionary of dataset -> datetime.time overriding PUBLISH_SCHEDULE.
+        :param min_interval: Seconds between the first polls of a dataset.
+        :param max_interval: Longest wait in seconds between two polls of a dataset.
+        :param backoff: Factor the wait grows by after every poll that finds nothing new.
+        :param deadline: datetime after which the watcher gives up. Defaults to midnight after date.
+        :param select_type: The type passed to T86.
+        :param typed: Convert the columns to numeric, datetime64 and categorical dtypes.
+        :param proxy: Optional proxy settings for the requests.
+        :param rate_limiter: Rate limiter shared by the requests.
+        :param session: Optional Session for the requests.
+        """
+        for dataset in datasets:
+            if dataset not in WATCH_REQUESTS:
+                raise ValueError(f"Unknown dataset: {dataset}")
+        self.date = date or datetime.now(TAIPEI).strftime('%Y%m%d')
+        day = datetime.strptime(self.date, '%Y%m%d').replace(tzinfo=TAIPEI)
+        schedule = {**PUBLISH_SCHEDULE, **(schedule or {})}
+        self.deadline = (deadline or day + timedelta(days=1)).timestamp()
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.select_type = select_type
+        self.typed = typed
+        self.proxy = proxy
+        self.rate_limiter = rate_limiter
+        self.session = session
+        # dataset -> poll state; a dataset leaves it once it has been yielded.
+        self.pending = {
+            dataset: {'next_poll': datetime.combine(day.date(), schedule[dataset], TAIPEI).timestamp(),
+                      'interval': min_interval, 'polls': 0, 'validators': {}}
+            for dataset in datasets
+        }
+
+    def __iter__(self):
+        """
+        Yield (dataset, DataFrame) pairs in the order the datasets are published. The
+        iteration ends once every dataset has been yielded or the deadline has passed;
+        the datasets still missing are then left in `pending`.
+        """
+        while self.pending:
+            dataset = min(self.pending, key=lambda name: self.pending[name]['next_poll'])
+            state = self.pending[dataset]
+            if state['next_poll'] > self.deadline:
+                logger.warning("Gave up watching %s for %s: not published by the deadline", ', '.join(self.pending), self.date)
+                return
+            time.sleep(max(0.0, state['next_poll'] - time.time()))
+
+            df = self.poll(dataset)
+            if df is not None:
+                del self.pending[dataset]
+                yield dataset, convert_types(df) if self.typed else df
+            else:
+                state['next_poll'] = time.time() + state['interval'] * random.uniform(0.9, 1.1)
+                state['interval'] = min(state['interval'] * self.backoff, self.max_interval)
+
+    def run(self, callback):
+        """
+        Watch until every dataset is published or the deadline passes, calling
+        callback(dataset, df) for each as soon as it lands.
+
+        :return: Dictionary of dataset -> DataFrame of the published datasets.
+        """
+        frames = {}
+        for dataset, df in self:
+            callback(dataset, df)
+            frames[dataset] = df
+        return frames
+
+    def poll(self, dataset):
+        """
+        Send one conditional request for a dataset.
+
+        :return: The parsed DataFrame once published, otherwise None. A date before the
+            current session that still has no data is final and returns an empty DataFrame.
+        """
+        path, params = WATCH_REQUESTS[dataset]
+        url = f"{BASE_URL}/{path}"
+        params = {'date': self.date, **{key: value or self.select_type for key, value in params.items()}, 'response': 'json'}
+        state = self.pending[dataset]
+        state['polls'] += 1
+
+        try:
+            response = limited_request(url, headers={**DEFAULT_HEADERS, **state['validators']}, params=params, proxy=self.proxy,
+                                       rate_limiter=self.rate_limiter, cache=False, session=self.session)
+        except CrawlerException as e:
+            logger.warning("Polling %s for %s failed: %s", endpoint_name(url), self.date, e)
+            return None
+        if response.status_code == 304:
+            return None
+        if response.status_code != 200:
+            logger.warning("Polling %s for %s failed with status %s", endpoint_name(url), self.date, response.status_code)
+            return None
+
+        with default_metrics.timer('parse_seconds', endpoint_name(url)):
+            try:
+                data = decode_json(response.content)
+            except CrawlerException as e:  # e.g. the HTML throttling or maintenance page, retried with the normal backoff
+                logger.warning("Polling %s for %s returned no JSON: %s", endpoint_name(url), self.date, e)
+                return None
+            state['validators'] = {header: response.headers[source] for header, source in
+                                   (('If-None-Match', 'ETag'), ('If-Modified-Since', 'Last-Modified'))
+                                   if source in response.headers}
+            if data.get('stat') == 'OK':
+                df = parse_published(dataset, data, self.date, params)
+                if not df.empty:
+                    logger.info("%s for %s published, found after %d polls", endpoint_name(url), self.date, state['polls'])
+                    return df
+        if is_closed(url, params):  # A past date does not get published later
+            record_empty(url, params)
+            return pd.DataFrame()
+        return None
+
+
+def parse_published(dataset, data, date, params):
+    """
+    Build the DataFrame of a published dataset, as returned by the matching core function.
+    """
+    if dataset == 'prices':
+        return parse_daily_closing_prices(data, 8)
+    if dataset == 'margin':
+        return parse_margin_trading(data, date)
+    if dataset == 'ratios':
+        return parse_daily_stock_ratios(data, date, params['selectType'])
+    return parse_FIP_trading_data(data, date, params['selectType'])
+
+
+def watch(date=None, datasets=tuple(WATCH_REQUESTS), callback=None, **kwargs):
+    """
+    Watch for the tables of a date to be published after the close.
+
+    Without a callback, return a PublishWatcher to iterate over:
+        for dataset, df in watch('20240701', ['prices', 'institutional']): ...
+    With a callback, block until every dataset has landed or the deadline has passed,
+    calling callback(dataset, df) for each, and return the DataFrames by dataset.
+
+    :param date: The date to watch (format: YYYYMMDD). Defaults to today in Taipei.
+    :param datasets: Datasets to watch, any of 'prices', 'margin', 'ratios', 'institutional'.
+    :param callback: Optional function called with (dataset, DataFrame).
+    :param kwargs: Passed to PublishWatcher, e.g. schedule, min_interval, max_interval, deadline, session.
+    """
+    watcher = PublishWatcher(date, datasets, **kwargs)
+    if callback is None:
+        return watcher
+    return watcher.run(callback)
+
+# Usage example:
+# for dataset, df in watch(datasets=['prices', 'ratios', 'institutional', 'margin']):
+#     publish_signal(dataset, df)